@@ -1,33 +1,112 @@
-import structlog
-from typing import Dict, List, Any, Optional
-from datetime import datetime
-import uuid
-import json
+import asyncio
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Any, Optional, Set
+from pydantic import ValidationError
 from .granite_client import GraniteClient
-from .db import SessionLocal, Scenario, Prediction, Plan, Report
+from .db import SessionLocal, Scenario, Prediction, Plan, Report, PDF_RENDER_FAILED, bulk_persist
+from .models import DisasterScenario
+from .utils.ids import new_id, new_ids
+from .utils.costs import cost_breakdown, cost_breakdowns, medical_cost
 from .utils.report import ReportGenerator
+from .utils.logger import get_logger
 
-logger = structlog.get_logger(__name__)
+logger = get_logger(__name__)
+
+# Shared by every workflow so the Granite prompt cache and HTTP connections,
+# and the report output setup, outlive individual requests
+_GRANITE = GraniteClient()
+_REPORTS = ReportGenerator()
 
 # TODO(API_KEY): Import IBM Agent Development Kit when available
 # from ibm_adk import Agent, Workflow, Node
 # For now, we'll create a mock ADK workflow structure
 
 
+# Pending PDF trackers, referenced here so the loop does not drop them mid-flight
+_PDF_TRACKERS: Set[asyncio.Task] = set()
+
+
+def _record_pdf_path(report_id: str, pdf_path: str) -> None:
+    """Store a rendered PDF's path on its report row"""
+    db = SessionLocal()
+    try:
+        db.query(Report).filter(Report.id == report_id).update({Report.pdf_path: pdf_path})
+        db.commit()
+    finally:
+        db.close()
+
+
+async def _track_pdf(report_id: str, pdf_future: Future) -> None:
+    """Wait for a PDF render, then record its path from a worker thread"""
+    try:
+        pdf_path = await asyncio.wrap_future(pdf_future)
+    except Exception as e:
+        # Includes BrokenProcessPool when a render worker dies; mark the row so
+        # downloads stop reporting the PDF as pending
+        logger.error("PDF rendering failed", report_id=report_id, error=str(e))
+        pdf_path = PDF_RENDER_FAILED
+    
+    try:
+        await asyncio.to_thread(_record_pdf_path, report_id, pdf_path)
+    except Exception as e:
+        logger.error("Failed to record PDF path", report_id=report_id, error=str(e))
+        return
+    
+    if pdf_path != PDF_RENDER_FAILED:
+        logger.info("Report PDF rendered", report_id=report_id, pdf_path=pdf_path)
+
+
+@dataclass(slots=True)
+class WorkflowContext:
+    """State handed from node to node while one scenario moves through the workflow"""
+    scenario_data: Dict[str, Any]
+    scenario_id: Optional[str] = None
+    prediction_id: Optional[str] = None
+    plan_id: Optional[str] = None
+    report_id: Optional[str] = None
+    prediction_result: Optional[Dict[str, Any]] = None
+    allocation_result: Optional[Dict[str, Any]] = None
+    narrative: Optional[str] = None
+    pdf_future: Optional[Future] = None
+    status: str = "pending"
+    # ORM rows staged by the nodes, inserted together once the workflow succeeds
+    rows: List[Any] = field(default_factory=list)
+
+
+def _insert_rows(rows: List[Any]) -> None:
+    """Insert a workflow's staged rows in a single transaction"""
+    with SessionLocal.begin() as db:
+        db.add_all(rows)
+
+
+def _track_pdfs(contexts: List[WorkflowContext]) -> None:
+    """Record each persisted report's PDF path as its render finishes"""
+    # The pool's result thread only resolves the future; the database update
+    # runs in the default executor so a slow write never holds up other renders
+    for context in contexts:
+        task = asyncio.ensure_future(_track_pdf(context.report_id, context.pdf_future))
+        _PDF_TRACKERS.add(task)
+        task.add_done_callback(_PDF_TRACKERS.discard)
+
+
+NodeFunction = Callable[[WorkflowContext], Awaitable[WorkflowContext]]
+
+
 class AgentNode:
     """Mock ADK Agent Node for development"""
-    def __init__(self, name: str, function):
+    def __init__(self, name: str, function: NodeFunction):
         self.name = name
         self.function = function
         self.status = "pending"
         self.result = None
         self.error = None
     
-    def execute(self, context: Dict[str, Any]) -> Dict[str, Any]:
+    async def execute(self, context: WorkflowContext) -> WorkflowContext:
         try:
             logger.info(f"Executing agent node: {self.name}")
             self.status = "running"
-            self.result = self.function(context)
+            self.result = await self.function(context)
             self.status = "completed"
             logger.info(f"Agent node completed: {self.name}")
             return self.result
@@ -42,269 +121,331 @@ class AgenticWorkflow:
     """IBM ADK-inspired workflow orchestration for disaster response"""
     
     def __init__(self):
-        self.granite_client = GraniteClient()
-        self.report_generator = ReportGenerator()
+        self.granite_client = _GRANITE
+        self.report_generator = _REPORTS
         self.workflow_id = None
         
     def create_workflow(self) -> str:
         """Create a new workflow instance"""
-        self.workflow_id = str(uuid.uuid4())
+        self.workflow_id = new_id()
         logger.info("Created new agentic workflow", workflow_id=self.workflow_id)
         return self.workflow_id
     
-    def ingest_scenario_node(self, context: Dict[str, Any]) -> Dict[str, Any]:
+    async def ingest_scenario_node(self, context: WorkflowContext) -> WorkflowContext:
         """Agent Node 1: Ingest and validate disaster scenario"""
-        scenario_data = context.get('scenario_data')
+        scenario_data = context.scenario_data
         if not scenario_data:
             raise ValueError("No scenario data provided")
         
-        # Validate scenario data
-        required_fields = ['disaster_type', 'severity', 'location', 'affected_area_km2']
-        for field in required_fields:
-            if field not in scenario_data:
-                raise ValueError(f"Missing required field: {field}")
+        # Validate scenario data against the API model (pydantic-core)
+        try:
+            validated = DisasterScenario.model_validate(scenario_data)
+        except ValidationError as e:
+            raise ValueError(f"Invalid scenario data: {e}") from e
         
-        # Generate scenario ID
-        scenario_id = str(uuid.uuid4())
+        # Generate scenario ID unless the caller preassigned one
+        if context.scenario_id is None:
+            context.scenario_id = new_id()
         
-        # Save to database
-        db = SessionLocal()
-        try:
-            scenario = Scenario(
-                id=scenario_id,
-                disaster_type=scenario_data['disaster_type'],
-                severity=scenario_data['severity'],
-                latitude=scenario_data['location']['latitude'],
-                longitude=scenario_data['location']['longitude'],
-                city=scenario_data['location']['city'],
-                state=scenario_data['location']['state'],
-                country=scenario_data['location']['country'],
-                population=scenario_data['location']['population'],
-                affected_area_km2=scenario_data['affected_area_km2'],
-                estimated_casualties=scenario_data['estimated_casualties'],
-                infrastructure_damage=scenario_data['infrastructure_damage'],
-                weather_conditions=scenario_data['weather_conditions'],
-                available_volunteers=scenario_data['available_volunteers'],
-                description=scenario_data['description']
-            )
-            db.add(scenario)
-            db.commit()
-            
-            logger.info("Scenario ingested successfully", scenario_id=scenario_id)
-            return {
-                'scenario_id': scenario_id,
-                'scenario_data': scenario_data,
-                'status': 'ingested'
-            }
-        finally:
-            db.close()
+        # Stage for the workflow transaction
+        location = validated.location
+        scenario = Scenario(
+            id=context.scenario_id,
+            disaster_type=validated.disaster_type.value,
+            severity=validated.severity.value,
+            latitude=location.latitude,
+            longitude=location.longitude,
+            city=location.city,
+            state=location.state,
+            country=location.country,
+            population=location.population,
+            affected_area_km2=validated.affected_area_km2,
+            estimated_casualties=validated.estimated_casualties,
+            infrastructure_damage=validated.infrastructure_damage,
+            weather_conditions=validated.weather_conditions,
+            available_volunteers=validated.available_volunteers,
+            description=validated.description
+        )
+        context.rows.append(scenario)
+        
+        logger.info("Scenario ingested successfully", scenario_id=context.scenario_id)
+        context.status = 'ingested'
+        return context
     
-    def predict_resources_node(self, context: Dict[str, Any]) -> Dict[str, Any]:
+    async def predict_resources_node(self, context: WorkflowContext) -> WorkflowContext:
         """Agent Node 2: Use Granite to predict resource needs"""
-        scenario_id = context.get('scenario_id')
-        scenario_data = context.get('scenario_data')
+        if not context.scenario_data:
+            raise ValueError("Missing scenario information")
         
-        if not scenario_id or not scenario_data:
+        # Call Granite for resource prediction unless the caller supplied one; it
+        # only needs the raw scenario, so the prediction is persisted once the
+        # scenario has been ingested
+        if context.prediction_result is None:
+            context.prediction_result = await self.granite_client.predict_resources(context.scenario_data)
+        context.status = 'predicted'
+        return context
+    
+    async def save_prediction_node(self, context: WorkflowContext) -> WorkflowContext:
+        """Stage the Granite prediction once the scenario has been ingested"""
+        if not context.scenario_id or not context.prediction_result:
             raise ValueError("Missing scenario information")
         
-        # Call Granite for resource prediction
-        prediction_result = self.granite_client.predict_resources(scenario_data)
+        return self._save_prediction(context)
+    
+    def _save_prediction(self, context: WorkflowContext) -> WorkflowContext:
+        """Stage a Granite resource prediction for a scenario"""
+        prediction_result = context.prediction_result
+        if context.prediction_id is None:
+            context.prediction_id = new_id()
         
-        # Save prediction to database
-        db = SessionLocal()
-        try:
-            prediction = Prediction(
-                id=str(uuid.uuid4()),
-                scenario_id=scenario_id,
-                predicted_needs=prediction_result['predicted_needs'],
-                confidence_score=prediction_result['confidence_score'],
-                estimated_response_time_hours=prediction_result['estimated_response_time_hours'],
-                risk_factors=prediction_result['risk_factors']
-            )
-            db.add(prediction)
-            db.commit()
-            
-            logger.info("Resource prediction completed", 
-                       scenario_id=scenario_id, 
-                       prediction_id=prediction.id,
-                       confidence=prediction_result['confidence_score'])
-            
-            return {
-                'prediction_id': prediction.id,
-                'prediction_result': prediction_result,
-                'status': 'predicted'
-            }
-        finally:
-            db.close()
+        prediction = Prediction(
+            id=context.prediction_id,
+            scenario_id=context.scenario_id,
+            predicted_needs=prediction_result['predicted_needs'],
+            confidence_score=prediction_result['confidence_score'],
+            estimated_response_time_hours=prediction_result['estimated_response_time_hours'],
+            risk_factors=prediction_result['risk_factors']
+        )
+        context.rows.append(prediction)
+        
+        logger.info("Resource prediction completed", 
+                   scenario_id=context.scenario_id, 
+                   prediction_id=prediction.id,
+                   confidence=prediction_result['confidence_score'])
+        
+        context.status = 'predicted'
+        return context
     
-    def generate_allocation_node(self, context: Dict[str, Any]) -> Dict[str, Any]:
+    async def generate_allocation_node(self, context: WorkflowContext) -> WorkflowContext:
         """Agent Node 3: Use Granite to generate optimized allocation plan"""
-        scenario_id = context.get('scenario_id')
-        scenario_data = context.get('scenario_data')
-        predicted_needs = context.get('prediction_result', {}).get('predicted_needs', [])
+        predicted_needs = (context.prediction_result or {}).get('predicted_needs', [])
         
-        if not scenario_id or not scenario_data or not predicted_needs:
+        if not context.scenario_id or not context.scenario_data or not predicted_needs:
             raise ValueError("Missing required context for allocation planning")
         
         # Call Granite for allocation planning
-        allocation_result = self.granite_client.generate_allocation_plan(scenario_data, predicted_needs)
+        context.allocation_result = await self.granite_client.generate_allocation_plan(
+            context.scenario_data, predicted_needs
+        )
         
-        # Save plan to database
-        db = SessionLocal()
-        try:
-            plan = Plan(
-                id=str(uuid.uuid4()),
-                scenario_id=scenario_id,
-                resource_allocations=allocation_result['resource_allocations'],
-                volunteer_assignments=allocation_result['volunteer_assignments'],
-                timeline_hours=allocation_result['timeline_hours'],
-                total_cost=allocation_result['total_cost'],
-                efficiency_score=allocation_result['efficiency_score']
-            )
-            db.add(plan)
-            db.commit()
-            
-            logger.info("Allocation plan generated", 
-                       scenario_id=scenario_id, 
-                       plan_id=plan.id,
-                       efficiency=allocation_result['efficiency_score'])
-            
-            return {
-                'plan_id': plan.id,
-                'allocation_result': allocation_result,
-                'status': 'allocated'
-            }
-        finally:
-            db.close()
+        return self._save_plan(context)
     
-    def save_to_database_node(self, context: Dict[str, Any]) -> Dict[str, Any]:
-        """Agent Node 4: Save all results to database (already done in previous nodes)"""
-        scenario_id = context.get('scenario_id')
-        prediction_id = context.get('prediction_id')
-        plan_id = context.get('plan_id')
+    def _save_plan(self, context: WorkflowContext) -> WorkflowContext:
+        """Stage a Granite allocation plan for a scenario"""
+        allocation_result = context.allocation_result
+        if context.plan_id is None:
+            context.plan_id = new_id()
         
-        logger.info("Database save completed", 
-                   scenario_id=scenario_id,
-                   prediction_id=prediction_id,
-                   plan_id=plan_id)
+        plan = Plan(
+            id=context.plan_id,
+            scenario_id=context.scenario_id,
+            resource_allocations=allocation_result['resource_allocations'],
+            volunteer_assignments=allocation_result['volunteer_assignments'],
+            timeline_hours=allocation_result['timeline_hours'],
+            total_cost=allocation_result['total_cost'],
+            efficiency_score=allocation_result['efficiency_score']
+        )
+        context.rows.append(plan)
         
-        return {
-            'status': 'saved',
-            'message': 'All data successfully saved to database'
-        }
+        logger.info("Allocation plan generated", 
+                   scenario_id=context.scenario_id, 
+                   plan_id=plan.id,
+                   efficiency=allocation_result['efficiency_score'])
+        
+        context.status = 'allocated'
+        return context
     
-    def generate_report_node(self, context: Dict[str, Any]) -> Dict[str, Any]:
-        """Agent Node 5: Generate comprehensive report using Granite narrative"""
-        scenario_id = context.get('scenario_id')
-        prediction_result = context.get('prediction_result')
-        allocation_result = context.get('allocation_result')
-        scenario_data = context.get('scenario_data')
-        
-        if not all([scenario_id, prediction_result, allocation_result, scenario_data]):
+    async def generate_report_node(self, context: WorkflowContext) -> WorkflowContext:
+        """Agent Node 4: Generate comprehensive report using Granite narrative"""
+        if not all([context.scenario_id, context.prediction_result,
+                    context.allocation_result, context.scenario_data]):
             raise ValueError("Missing required context for report generation")
         
         # Generate narrative using Granite
-        narrative = self.granite_client.generate_narrative_report(
-            scenario_data, prediction_result, allocation_result
+        context.narrative = await self.granite_client.generate_narrative_report(
+            context.scenario_data, context.prediction_result, context.allocation_result
         )
         
-        # Generate PDF report
-        pdf_path = self.report_generator.generate_report(
-            scenario_data, prediction_result, allocation_result, narrative
+        return self._save_report(context)
+    
+    def _save_report(self, context: WorkflowContext,
+                     breakdown: Optional[Dict[str, float]] = None,
+                     pdf_future: Optional[Future] = None) -> WorkflowContext:
+        """Queue the PDF render (unless already queued) and stage the report for a scenario"""
+        prediction_result = context.prediction_result
+        allocation_result = context.allocation_result
+        if context.report_id is None:
+            context.report_id = new_id()
+        
+        # Render the PDF in the background; the row's pdf_path is filled in
+        # once rendering finishes
+        context.pdf_future = pdf_future or self.report_generator.submit_report(
+            context.scenario_data, prediction_result, allocation_result, context.narrative
         )
         
-        # Save report to database
-        db = SessionLocal()
-        try:
-            report = Report(
-                id=str(uuid.uuid4()),
-                scenario_id=scenario_id,
-                prediction_id=context.get('prediction_id'),
-                plan_id=context.get('plan_id'),
-                narrative_summary=narrative,
-                key_recommendations=[
-                    "Immediate medical response deployment",
-                    "Establish emergency communication channels",
-                    "Coordinate with local authorities",
-                    "Monitor weather conditions"
-                ],
-                risk_assessment="High risk due to infrastructure damage and limited access",
-                cost_breakdown={
-                    "medical_supplies": prediction_result.get('predicted_needs', [{}])[0].get('estimated_cost', 0),
-                    "logistics": allocation_result.get('total_cost', 0) * 0.3,
-                    "coordination": allocation_result.get('total_cost', 0) * 0.2
-                },
-                pdf_path=pdf_path
-            )
-            db.add(report)
-            db.commit()
-            
-            logger.info("Report generated successfully", 
-                       scenario_id=scenario_id, 
-                       report_id=report.id,
-                       pdf_path=pdf_path)
-            
-            return {
-                'report_id': report.id,
-                'pdf_path': pdf_path,
-                'narrative': narrative,
-                'status': 'reported'
-            }
-        finally:
-            db.close()
+        report = Report(
+            id=context.report_id,
+            scenario_id=context.scenario_id,
+            prediction_id=context.prediction_id,
+            plan_id=context.plan_id,
+            narrative_summary=context.narrative,
+            key_recommendations=[
+                "Immediate medical response deployment",
+                "Establish emergency communication channels",
+                "Coordinate with local authorities",
+                "Monitor weather conditions"
+            ],
+            risk_assessment="High risk due to infrastructure damage and limited access",
+            cost_breakdown=breakdown or cost_breakdown(prediction_result, allocation_result),
+            pdf_path=None
+        )
+        context.rows.append(report)
+        
+        logger.info("Report generated successfully", 
+                   scenario_id=context.scenario_id, 
+                   report_id=report.id)
+        
+        context.status = 'reported'
+        return context
     
-    def execute_workflow(self, scenario_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Execute the complete agentic workflow"""
+    async def execute_workflow(self, scenario_data: Dict[str, Any],
+                               prediction_result: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Execute the complete agentic workflow, optionally from an existing prediction"""
         workflow_id = self.create_workflow()
-        context = {'scenario_data': scenario_data}
-        
-        # Define workflow nodes
-        nodes = [
-            AgentNode("ingest_scenario", self.ingest_scenario_node),
-            AgentNode("predict_resources", self.predict_resources_node),
-            AgentNode("generate_allocation", self.generate_allocation_node),
-            AgentNode("save_to_database", self.save_to_database_node),
-            AgentNode("generate_report", self.generate_report_node)
-        ]
+        context = WorkflowContext(scenario_data=scenario_data, prediction_result=prediction_result)
         
-        # Execute workflow sequentially
-        workflow_results = {}
+        # Define workflow stages; nodes within a stage only depend on earlier
+        # stages, write disjoint context fields and run concurrently
+        stages = [
+            [
+                AgentNode("ingest_scenario", self.ingest_scenario_node),
+                AgentNode("predict_resources", self.predict_resources_node)
+            ],
+            [
+                AgentNode("save_prediction", self.save_prediction_node),
+                AgentNode("generate_allocation", self.generate_allocation_node)
+            ],
+            [AgentNode("generate_report", self.generate_report_node)]
+        ]
         
-        for node in nodes:
+        for stage in stages:
             try:
-                result = node.execute(context)
-                workflow_results[node.name] = result
-                context.update(result)  # Pass results to next node
-                
-                logger.info(f"Workflow step completed: {node.name}", 
-                           workflow_id=workflow_id,
-                           status=node.status)
-                
+                await asyncio.gather(*(node.execute(context) for node in stage))
             except Exception as e:
-                logger.error(f"Workflow step failed: {node.name}", 
+                failed = [node.name for node in stage if node.status == "failed"]
+                logger.error(f"Workflow step failed: {', '.join(failed)}", 
                            workflow_id=workflow_id,
                            error=str(e))
                 raise
+            
+            for node in stage:
+                logger.info(f"Workflow step completed: {node.name}", 
+                           workflow_id=workflow_id,
+                           status=node.status)
         
-        # Compile final results
-        final_result = {
-            'workflow_id': workflow_id,
-            'status': 'completed',
-            'scenario_id': context.get('scenario_id'),
-            'prediction_id': context.get('prediction_id'),
-            'plan_id': context.get('plan_id'),
-            'report_id': context.get('report_id'),
-            'pdf_path': context.get('pdf_path'),
-            'summary': {
-                'confidence_score': context.get('prediction_result', {}).get('confidence_score'),
-                'efficiency_score': context.get('allocation_result', {}).get('efficiency_score'),
-                'total_cost': context.get('allocation_result', {}).get('total_cost'),
-                'timeline_hours': context.get('allocation_result', {}).get('timeline_hours')
-            }
-        }
+        # Persist every row staged by the nodes in a single transaction
+        await asyncio.to_thread(_insert_rows, context.rows)
+        _track_pdfs([context])
+        
+        logger.info("Database save completed", 
+                   workflow_id=workflow_id,
+                   scenario_id=context.scenario_id,
+                   prediction_id=context.prediction_id,
+                   plan_id=context.plan_id,
+                   report_id=context.report_id)
+        
+        final_result = self._compile_result(workflow_id, context)
         
         logger.info("Agentic workflow completed successfully", 
                    workflow_id=workflow_id,
                    final_status=final_result['status'])
         
         return final_result
+    
+    async def execute_workflow_batch(self, scenarios: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Execute the agentic workflow for several scenarios with batched Granite calls"""
+        workflow_id = self.create_workflow()
+        
+        # Preassign every record ID for the batch from one pool of random bytes
+        ids = iter(new_ids(4 * len(scenarios)))
+        contexts = [
+            WorkflowContext(
+                scenario_data=scenario_data,
+                scenario_id=next(ids),
+                prediction_id=next(ids),
+                plan_id=next(ids),
+                report_id=next(ids)
+            )
+            for scenario_data in scenarios
+        ]
+        
+        # Fan out: ingest each scenario while one Granite request predicts the whole batch
+        *_, prediction_results = await asyncio.gather(
+            *(self.ingest_scenario_node(context) for context in contexts),
+            self.granite_client.predict_resources_batch(scenarios)
+        )
+        for context, prediction_result in zip(contexts, prediction_results):
+            context.prediction_result = prediction_result
+            self._save_prediction(context)
+        
+        allocation_results = await self.granite_client.generate_allocation_plan_batch(
+            scenarios,
+            [result.get('predicted_needs', []) for result in prediction_results]
+        )
+        for context, allocation_result in zip(contexts, allocation_results):
+            context.allocation_result = allocation_result
+            self._save_plan(context)
+        
+        narratives = await self.granite_client.generate_narrative_report_batch(
+            scenarios, prediction_results, allocation_results
+        )
+        
+        # Roll up every plan's cost breakdown in one pass before rendering
+        breakdowns = cost_breakdowns(
+            [medical_cost(result) for result in prediction_results],
+            [result.get('total_cost', 0) for result in allocation_results]
+        )
+        
+        # Fan in: queue the whole batch's renders across the PDF pool at once
+        pdf_futures = self.report_generator.submit_batch(
+            zip(scenarios, prediction_results, allocation_results, narratives)
+        )
+        for context, narrative, breakdown, pdf_future in zip(contexts, narratives, breakdowns, pdf_futures):
+            context.narrative = narrative
+            self._save_report(context, breakdown, pdf_future)
+        
+        # Stream the whole batch into Postgres with COPY rather than
+        # flushing one INSERT per staged row
+        pending = [row for context in contexts for row in context.rows]
+        await asyncio.to_thread(
+            bulk_persist,
+            *([row for row in pending if isinstance(row, model)]
+              for model in (Scenario, Prediction, Plan, Report))
+        )
+        _track_pdfs(contexts)
+        
+        logger.info("Batched agentic workflow completed successfully", 
+                   workflow_id=workflow_id,
+                   batch_size=len(contexts))
+        
+        return [self._compile_result(workflow_id, context) for context in contexts]
+    
+    def _compile_result(self, workflow_id: str, context: WorkflowContext) -> Dict[str, Any]:
+        """Compile the final workflow result from the accumulated context"""
+        prediction_result = context.prediction_result or {}
+        allocation_result = context.allocation_result or {}
+        return {
+            'workflow_id': workflow_id,
+            'status': 'completed',
+            'scenario_id': context.scenario_id,
+            'prediction_id': context.prediction_id,
+            'plan_id': context.plan_id,
+            'report_id': context.report_id,
+            'download_url': f"/download/{context.report_id}",
+            'summary': {
+                'confidence_score': prediction_result.get('confidence_score'),
+                'efficiency_score': allocation_result.get('efficiency_score'),
+                'total_cost': allocation_result.get('total_cost'),
+                'timeline_hours': allocation_result.get('timeline_hours')
+            }
+        }
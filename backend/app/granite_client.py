@@ -1,17 +1,198 @@
-import requests
-import json
-import structlog
+import copy
+import httpx
+import orjson
+import string
+from types import MappingProxyType
 from typing import Dict, List, Any, Optional
-from datetime import datetime
 import os
 
-logger = structlog.get_logger(__name__)
+from .utils.cache import PromptCache
+from .utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 # TODO(API_KEY): Replace with actual IBM Watsonx.ai Granite API credentials
 GRANITE_API_KEY = os.getenv("GRANITE_API_KEY", "TODO_REPLACE_WITH_ACTUAL_API_KEY")
 GRANITE_API_URL = os.getenv("GRANITE_API_URL", "https://api.watsonx.ai/v1/text/generation")
 GRANITE_MODEL = os.getenv("GRANITE_MODEL", "ibm/granite-13b-instruct-v2")
 
+# Shared across clients so keep-alive connections and TLS sessions are reused;
+# the transport retries failed connection attempts before surfacing an error
+_HTTP_CLIENT = httpx.AsyncClient(
+    timeout=httpx.Timeout(30.0, connect=3.0),
+    transport=httpx.AsyncHTTPTransport(
+        http2=True,
+        retries=3,
+        limits=httpx.Limits(max_connections=64, max_keepalive_connections=32)
+    )
+)
+
+# Prompt scaffolding is fixed; only the scenario values are substituted per call
+_PREDICT_TMPL = string.Template("""
+        Analyze the following disaster scenario and predict resource needs:
+        
+        Disaster Type: $disaster_type
+        Severity: $severity
+        Location: $city, $country
+        Affected Area: $affected_area_km2 km²
+        Population: $population
+        Estimated Casualties: $estimated_casualties
+        Available Volunteers: $available_volunteers
+        
+        Please provide a JSON response with:
+        - predicted_needs: List of resources with type, quantity, priority, cost, delivery time
+        - confidence_score: Prediction confidence (0-1)
+        - estimated_response_time_hours: Estimated time to respond
+        - risk_factors: List of key risk factors
+        """)
+
+_ALLOCATION_TMPL = string.Template("""
+        Generate an optimized resource allocation plan for the following disaster scenario:
+        
+        Disaster Type: $disaster_type
+        Severity: $severity
+        Location: $city, $country
+        Available Volunteers: $available_volunteers
+        
+        Predicted Resource Needs:
+        $predicted_needs
+        
+        Please provide a JSON response with:
+        - resource_allocations: Optimized allocation of resources
+        - volunteer_assignments: Team assignments for different tasks
+        - timeline_hours: Estimated timeline for deployment
+        - total_cost: Total estimated cost
+        - efficiency_score: Plan efficiency score (0-1)
+        """)
+
+_NARRATIVE_TMPL = string.Template("""
+        Generate a comprehensive narrative report for the disaster response scenario:
+        
+        Scenario: $disaster_type - $severity severity in $city, $country
+        
+        Prediction Results:
+        - Confidence: $confidence
+        - Response Time: $response_time hours
+        - Risk Factors: $risk_factors
+        
+        Allocation Plan:
+        - Efficiency: $efficiency
+        - Total Cost: $$$total_cost
+        - Timeline: $timeline hours
+        
+        Please provide a professional narrative analysis suitable for decision-makers.
+        """)
+
+# Defaults used when Granite returns unparseable text; callers get a deep copy
+# because the workflow hands the nested lists on to the database and reports
+_FALLBACK_PREDICTION = MappingProxyType({
+    "predicted_needs": [
+        {
+            "resource_type": "medical_supplies",
+            "quantity": 1500,
+            "priority": "high",
+            "estimated_cost": 75000.0,
+            "delivery_time_hours": 6
+        }
+    ],
+    "confidence_score": 0.87,
+    "estimated_response_time_hours": 12,
+    "risk_factors": ["infrastructure_damage", "limited_access"]
+})
+
+_FALLBACK_ALLOCATION = MappingProxyType({
+    "resource_allocations": [
+        {
+            "resource_type": "medical_supplies",
+            "quantity": 1500,
+            "priority": "high",
+            "estimated_cost": 75000.0,
+            "delivery_time_hours": 6,
+            "allocation_strategy": "distributed_centers"
+        }
+    ],
+    "volunteer_assignments": {
+        "medical_response": ["Team Alpha", "Team Beta"],
+        "logistics": ["Team Gamma"]
+    },
+    "timeline_hours": 24,
+    "total_cost": 200000.0,
+    "efficiency_score": 0.92
+})
+
+# Canned development responses, indexed by the prompt kind the caller passes
+_MOCK: Dict[str, Dict[str, Any]] = {
+    "predict": {
+        "choices": [{
+            "text": orjson.dumps({
+                "predicted_needs": [
+                    {
+                        "resource_type": "medical_supplies",
+                        "quantity": 1500,
+                        "priority": "high",
+                        "estimated_cost": 75000.0,
+                        "delivery_time_hours": 6
+                    },
+                    {
+                        "resource_type": "water",
+                        "quantity": 5000,
+                        "priority": "critical",
+                        "estimated_cost": 25000.0,
+                        "delivery_time_hours": 2
+                    },
+                    {
+                        "resource_type": "shelter",
+                        "quantity": 200,
+                        "priority": "high",
+                        "estimated_cost": 100000.0,
+                        "delivery_time_hours": 8
+                    }
+                ],
+                "confidence_score": 0.87,
+                "estimated_response_time_hours": 12,
+                "risk_factors": ["infrastructure_damage", "limited_access", "weather_conditions"]
+            }).decode()
+        }]
+    },
+    "allocation": {
+        "choices": [{
+            "text": orjson.dumps({
+                "resource_allocations": [
+                    {
+                        "resource_type": "medical_supplies",
+                        "quantity": 1500,
+                        "priority": "high",
+                        "estimated_cost": 75000.0,
+                        "delivery_time_hours": 6,
+                        "allocation_strategy": "distributed_centers"
+                    },
+                    {
+                        "resource_type": "water",
+                        "quantity": 5000,
+                        "priority": "critical",
+                        "estimated_cost": 25000.0,
+                        "delivery_time_hours": 2,
+                        "allocation_strategy": "immediate_deployment"
+                    }
+                ],
+                "volunteer_assignments": {
+                    "medical_response": ["Team Alpha", "Team Beta"],
+                    "logistics": ["Team Gamma"],
+                    "coordination": ["Team Delta"]
+                },
+                "timeline_hours": 24,
+                "total_cost": 200000.0,
+                "efficiency_score": 0.92
+            }).decode()
+        }]
+    },
+    "narrative": {
+        "choices": [{
+            "text": "This is a comprehensive disaster response analysis generated by IBM Granite AI. The system has analyzed the scenario and provided detailed recommendations for resource allocation, volunteer coordination, and risk mitigation strategies."
+        }]
+    }
+}
+
 
 class GraniteClient:
     def __init__(self):
@@ -22,9 +203,15 @@ class GraniteClient:
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
+        self.cache = PromptCache()
     
-    def _make_request(self, prompt: str, max_tokens: int = 2048, temperature: float = 0.7) -> Dict[str, Any]:
-        """Make a request to IBM Granite API"""
+    async def _make_request(self, prompt: str, kind: str, max_tokens: int = 2048, temperature: float = 0.7) -> Dict[str, Any]:
+        """Make a request to IBM Granite API, serving repeated prompts from cache"""
+        cached = self.cache.get(prompt)
+        if cached is not None:
+            logger.info("Granite prompt cache hit", kind=kind)
+            return cached
+        
         payload = {
             "model": self.model,
             "prompt": prompt,
@@ -37,243 +224,165 @@ class GraniteClient:
         
         try:
             # TODO(API_KEY): Uncomment when API key is available
-            # response = requests.post(self.api_url, headers=self.headers, json=payload)
+            # response = await _HTTP_CLIENT.post(self.api_url, headers=self.headers, json=payload)
             # response.raise_for_status()
-            # return response.json()
+            # result = response.json()
 
             # Mock response for development
             logger.info("Using mock Granite response - replace with actual API call")
-            return self._mock_response(prompt)
+            result = _MOCK[kind]
 
         except Exception as e:
             logger.error("Granite API request failed", error=str(e))
             raise
-    
-    def _mock_response(self, prompt: str) -> Dict[str, Any]:
-        """Generate mock responses for development"""
-        if "resource prediction" in prompt.lower():
-            return {
-                "choices": [{
-                    "text": json.dumps({
-                        "predicted_needs": [
-                            {
-                                "resource_type": "medical_supplies",
-                                "quantity": 1500,
-                                "priority": "high",
-                                "estimated_cost": 75000.0,
-                                "delivery_time_hours": 6
-                            },
-                            {
-                                "resource_type": "water",
-                                "quantity": 5000,
-                                "priority": "critical",
-                                "estimated_cost": 25000.0,
-                                "delivery_time_hours": 2
-                            },
-                            {
-                                "resource_type": "shelter",
-                                "quantity": 200,
-                                "priority": "high",
-                                "estimated_cost": 100000.0,
-                                "delivery_time_hours": 8
-                            }
-                        ],
-                        "confidence_score": 0.87,
-                        "estimated_response_time_hours": 12,
-                        "risk_factors": ["infrastructure_damage", "limited_access", "weather_conditions"]
-                    })
-                }]
-            }
-        elif "allocation plan" in prompt.lower():
-            return {
-                "choices": [{
-                    "text": json.dumps({
-                        "resource_allocations": [
-                            {
-                                "resource_type": "medical_supplies",
-                                "quantity": 1500,
-                                "priority": "high",
-                                "estimated_cost": 75000.0,
-                                "delivery_time_hours": 6,
-                                "allocation_strategy": "distributed_centers"
-                            },
-                            {
-                                "resource_type": "water",
-                                "quantity": 5000,
-                                "priority": "critical",
-                                "estimated_cost": 25000.0,
-                                "delivery_time_hours": 2,
-                                "allocation_strategy": "immediate_deployment"
-                            }
-                        ],
-                        "volunteer_assignments": {
-                            "medical_response": ["Team Alpha", "Team Beta"],
-                            "logistics": ["Team Gamma"],
-                            "coordination": ["Team Delta"]
-                        },
-                        "timeline_hours": 24,
-                        "total_cost": 200000.0,
-                        "efficiency_score": 0.92
-                    })
-                }]
-            }
-        else:
-            return {
-                "choices": [{
-                    "text": "This is a comprehensive disaster response analysis generated by IBM Granite AI. The system has analyzed the scenario and provided detailed recommendations for resource allocation, volunteer coordination, and risk mitigation strategies."
-                }]
-            }
-    
-    def predict_resources(self, scenario_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Predict resource needs for a disaster scenario"""
-        prompt = f"""
-        Analyze the following disaster scenario and predict resource needs:
         
-        Disaster Type: {scenario_data.get('disaster_type')}
-        Severity: {scenario_data.get('severity')}
-        Location: {scenario_data.get('location', {}).get('city')}, {scenario_data.get('location', {}).get('country')}
-        Affected Area: {scenario_data.get('affected_area_km2')} km²
-        Population: {scenario_data.get('location', {}).get('population')}
-        Estimated Casualties: {scenario_data.get('estimated_casualties')}
-        Available Volunteers: {scenario_data.get('available_volunteers')}
+        self.cache.put(prompt, result, kind)
+        return result
+    
+    async def _make_request_batch(self, prompts: List[str], kind: str, max_tokens: int = 2048, temperature: float = 0.7) -> List[Dict[str, Any]]:
+        """Make a single batched request to IBM Granite API, returning one response per prompt"""
+        results: List[Optional[Dict[str, Any]]] = [self.cache.get(prompt) for prompt in prompts]
+        misses = [i for i, result in enumerate(results) if result is None]
+        if not misses:
+            logger.info("Granite prompt cache hit", kind=kind, batch_size=len(prompts))
+            return results
         
-        Please provide a JSON response with:
-        - predicted_needs: List of resources with type, quantity, priority, cost, delivery time
-        - confidence_score: Prediction confidence (0-1)
-        - estimated_response_time_hours: Estimated time to respond
-        - risk_factors: List of key risk factors
-        """
+        payload = {
+            "model": self.model,
+            "prompts": [prompts[i] for i in misses],
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "top_p": 0.9,
+            "frequency_penalty": 0.0,
+            "presence_penalty": 0.0
+        }
         
-        response = self._make_request(prompt)
-        result_text = response['choices'][0]['text']
+        try:
+            # TODO(API_KEY): Uncomment when API key is available
+            # response = await _HTTP_CLIENT.post(self.api_url, headers=self.headers, json=payload)
+            # response.raise_for_status()
+            # responses = response.json()['results']
+
+            # Mock response for development
+            logger.info("Using mock Granite batch response - replace with actual API call",
+                       batch_size=len(misses))
+            responses = [_MOCK[kind] for _ in payload["prompts"]]
+
+        except Exception as e:
+            logger.error("Granite API batch request failed", error=str(e), batch_size=len(misses))
+            raise
         
+        for i, response in zip(misses, responses):
+            self.cache.put(prompts[i], response, kind)
+            results[i] = response
+        return results
+    
+    def _build_prediction_prompt(self, scenario_data: Dict[str, Any]) -> str:
+        """Build the resource prediction prompt for a scenario"""
+        location = scenario_data.get('location', {})
+        return _PREDICT_TMPL.substitute(
+            disaster_type=scenario_data.get('disaster_type'),
+            severity=scenario_data.get('severity'),
+            city=location.get('city'),
+            country=location.get('country'),
+            affected_area_km2=scenario_data.get('affected_area_km2'),
+            population=location.get('population'),
+            estimated_casualties=scenario_data.get('estimated_casualties'),
+            available_volunteers=scenario_data.get('available_volunteers')
+        )
+    
+    def _parse_prediction(self, result_text: str) -> Dict[str, Any]:
+        """Parse a resource prediction response, falling back to default data"""
         try:
             # Try to parse JSON from response
             if result_text.strip().startswith('{'):
-                return json.loads(result_text)
-            else:
-                # Fallback to mock data if response is not JSON
-                return {
-                    "predicted_needs": [
-                        {
-                            "resource_type": "medical_supplies",
-                            "quantity": 1500,
-                            "priority": "high",
-                            "estimated_cost": 75000.0,
-                            "delivery_time_hours": 6
-                        }
-                    ],
-                    "confidence_score": 0.87,
-                    "estimated_response_time_hours": 12,
-                    "risk_factors": ["infrastructure_damage", "limited_access"]
-                }
-        except json.JSONDecodeError:
+                return orjson.loads(result_text)
+        except orjson.JSONDecodeError:
             logger.warning("Failed to parse JSON response, using fallback data")
-            return {
-                "predicted_needs": [
-                    {
-                        "resource_type": "medical_supplies",
-                        "quantity": 1500,
-                        "priority": "high",
-                        "estimated_cost": 75000.0,
-                        "delivery_time_hours": 6
-                    }
-                ],
-                "confidence_score": 0.87,
-                "estimated_response_time_hours": 12,
-                "risk_factors": ["infrastructure_damage", "limited_access"]
-            }
+        # Fallback to mock data if response is not JSON
+        return copy.deepcopy(dict(_FALLBACK_PREDICTION))
     
-    def generate_allocation_plan(self, scenario_data: Dict[str, Any], predicted_needs: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Generate optimized allocation plan"""
-        prompt = f"""
-        Generate an optimized resource allocation plan for the following disaster scenario:
-        
-        Disaster Type: {scenario_data.get('disaster_type')}
-        Severity: {scenario_data.get('severity')}
-        Location: {scenario_data.get('location', {}).get('city')}, {scenario_data.get('location', {}).get('country')}
-        Available Volunteers: {scenario_data.get('available_volunteers')}
-        
-        Predicted Resource Needs:
-        {json.dumps(predicted_needs, indent=2)}
-        
-        Please provide a JSON response with:
-        - resource_allocations: Optimized allocation of resources
-        - volunteer_assignments: Team assignments for different tasks
-        - timeline_hours: Estimated timeline for deployment
-        - total_cost: Total estimated cost
-        - efficiency_score: Plan efficiency score (0-1)
-        """
-        
-        response = self._make_request(prompt)
-        result_text = response['choices'][0]['text']
-        
+    async def predict_resources(self, scenario_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Predict resource needs for a disaster scenario"""
+        prompt = self._build_prediction_prompt(scenario_data)
+        response = await self._make_request(prompt, kind="predict")
+        return self._parse_prediction(response['choices'][0]['text'])
+    
+    async def predict_resources_batch(self, scenarios: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Predict resource needs for several scenarios in a single Granite request"""
+        prompts = [self._build_prediction_prompt(scenario_data) for scenario_data in scenarios]
+        responses = await self._make_request_batch(prompts, kind="predict")
+        return [self._parse_prediction(response['choices'][0]['text']) for response in responses]
+    
+    def _build_allocation_prompt(self, scenario_data: Dict[str, Any], predicted_needs: List[Dict[str, Any]]) -> str:
+        """Build the allocation plan prompt for a scenario"""
+        location = scenario_data.get('location', {})
+        return _ALLOCATION_TMPL.substitute(
+            disaster_type=scenario_data.get('disaster_type'),
+            severity=scenario_data.get('severity'),
+            city=location.get('city'),
+            country=location.get('country'),
+            available_volunteers=scenario_data.get('available_volunteers'),
+            predicted_needs=orjson.dumps(predicted_needs, option=orjson.OPT_INDENT_2).decode()
+        )
+    
+    def _parse_allocation(self, result_text: str) -> Dict[str, Any]:
+        """Parse an allocation plan response, falling back to default data"""
         try:
             # Try to parse JSON from response
             if result_text.strip().startswith('{'):
-                return json.loads(result_text)
-            else:
-                # Fallback to mock data if response is not JSON
-                return {
-                    "resource_allocations": [
-                        {
-                            "resource_type": "medical_supplies",
-                            "quantity": 1500,
-                            "priority": "high",
-                            "estimated_cost": 75000.0,
-                            "delivery_time_hours": 6,
-                            "allocation_strategy": "distributed_centers"
-                        }
-                    ],
-                    "volunteer_assignments": {
-                        "medical_response": ["Team Alpha", "Team Beta"],
-                        "logistics": ["Team Gamma"]
-                    },
-                    "timeline_hours": 24,
-                    "total_cost": 200000.0,
-                    "efficiency_score": 0.92
-                }
-        except json.JSONDecodeError:
+                return orjson.loads(result_text)
+        except orjson.JSONDecodeError:
             logger.warning("Failed to parse JSON response, using fallback data")
-            return {
-                "resource_allocations": [
-                    {
-                        "resource_type": "medical_supplies",
-                        "quantity": 1500,
-                        "priority": "high",
-                        "estimated_cost": 75000.0,
-                        "delivery_time_hours": 6,
-                        "allocation_strategy": "distributed_centers"
-                    }
-                ],
-                "volunteer_assignments": {
-                    "medical_response": ["Team Alpha", "Team Beta"],
-                    "logistics": ["Team Gamma"]
-                },
-                "timeline_hours": 24,
-                "total_cost": 200000.0,
-                "efficiency_score": 0.92
-            }
+        # Fallback to mock data if response is not JSON
+        return copy.deepcopy(dict(_FALLBACK_ALLOCATION))
+    
+    async def generate_allocation_plan(self, scenario_data: Dict[str, Any], predicted_needs: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Generate optimized allocation plan"""
+        prompt = self._build_allocation_prompt(scenario_data, predicted_needs)
+        response = await self._make_request(prompt, kind="allocation")
+        return self._parse_allocation(response['choices'][0]['text'])
+    
+    async def generate_allocation_plan_batch(self, scenarios: List[Dict[str, Any]],
+                                       predicted_needs_list: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Generate allocation plans for several scenarios in a single Granite request"""
+        prompts = [
+            self._build_allocation_prompt(scenario_data, predicted_needs)
+            for scenario_data, predicted_needs in zip(scenarios, predicted_needs_list)
+        ]
+        responses = await self._make_request_batch(prompts, kind="allocation")
+        return [self._parse_allocation(response['choices'][0]['text']) for response in responses]
+    
+    def _build_narrative_prompt(self, scenario_data: Dict[str, Any], prediction_result: Dict[str, Any], allocation_result: Dict[str, Any]) -> str:
+        """Build the narrative report prompt for a scenario"""
+        location = scenario_data.get('location', {})
+        return _NARRATIVE_TMPL.substitute(
+            disaster_type=scenario_data.get('disaster_type'),
+            severity=scenario_data.get('severity'),
+            city=location.get('city'),
+            country=location.get('country'),
+            confidence=f"{prediction_result.get('confidence_score', 0):.1%}",
+            response_time=prediction_result.get('estimated_response_time_hours', 0),
+            risk_factors=', '.join(prediction_result.get('risk_factors', [])),
+            efficiency=f"{allocation_result.get('efficiency_score', 0):.1%}",
+            total_cost=f"{allocation_result.get('total_cost', 0):,.2f}",
+            timeline=allocation_result.get('timeline_hours', 0)
+        )
     
-    def generate_narrative_report(self, scenario_data: Dict[str, Any], prediction_result: Dict[str, Any], allocation_result: Dict[str, Any]) -> str:
+    async def generate_narrative_report(self, scenario_data: Dict[str, Any], prediction_result: Dict[str, Any], allocation_result: Dict[str, Any]) -> str:
         """Generate narrative report"""
-        prompt = f"""
-        Generate a comprehensive narrative report for the disaster response scenario:
-        
-        Scenario: {scenario_data.get('disaster_type')} - {scenario_data.get('severity')} severity in {scenario_data.get('location', {}).get('city')}, {scenario_data.get('location', {}).get('country')}
-        
-        Prediction Results:
-        - Confidence: {prediction_result.get('confidence_score', 0):.1%}
-        - Response Time: {prediction_result.get('estimated_response_time_hours', 0)} hours
-        - Risk Factors: {', '.join(prediction_result.get('risk_factors', []))}
-        
-        Allocation Plan:
-        - Efficiency: {allocation_result.get('efficiency_score', 0):.1%}
-        - Total Cost: ${allocation_result.get('total_cost', 0):,.2f}
-        - Timeline: {allocation_result.get('timeline_hours', 0)} hours
-        
-        Please provide a professional narrative analysis suitable for decision-makers.
-        """
-        
-        response = self._make_request(prompt)
+        prompt = self._build_narrative_prompt(scenario_data, prediction_result, allocation_result)
+        response = await self._make_request(prompt, kind="narrative")
         return response['choices'][0]['text']
+    
+    async def generate_narrative_report_batch(self, scenarios: List[Dict[str, Any]],
+                                        prediction_results: List[Dict[str, Any]],
+                                        allocation_results: List[Dict[str, Any]]) -> List[str]:
+        """Generate narrative reports for several scenarios in a single Granite request"""
+        prompts = [
+            self._build_narrative_prompt(scenario_data, prediction_result, allocation_result)
+            for scenario_data, prediction_result, allocation_result
+            in zip(scenarios, prediction_results, allocation_results)
+        ]
+        responses = await self._make_request_batch(prompts, kind="narrative")
+        return [response['choices'][0]['text'] for response in responses]
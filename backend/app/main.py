@@ -1,19 +1,26 @@
-from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Depends, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import FileResponse, ORJSONResponse, Response
+from pydantic import ValidationError
+import asyncio
+import logging
+from datetime import datetime, timezone
+import orjson
 import time
-import uuid
-from typing import List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
 import os
+from sqlalchemy.orm import Session
 
 from .models import (
-    DisasterScenario, PredictionResponse, AllocationPlan, 
-    ReportData, APIResponse, DisasterType, SeverityLevel
+    DisasterScenario, APIResponse, DisasterType, SeverityLevel,
+    BatchRequest, BatchRequestItem, BatchResponse, BatchResponseItem
 )
 from .planner import DisasterResponsePlanner
-from .db import init_db, get_db
-from .utils.logger import setup_logging, get_logger, log_api_request, log_api_response
+from .db import init_db, get_db, SessionLocal, PDF_RENDER_FAILED
+from .utils.ids import new_id, new_request_id
+from .utils.cache import TTLCache, cached_response
+from .utils.middleware import DeduplicationMiddleware
+from .utils.logger import setup_logging, get_logger, is_enabled_for, log_api_request, log_api_response
 
 # Setup logging
 setup_logging()
@@ -25,51 +32,120 @@ app = FastAPI(
     description="AI-Powered Disaster Response Planning System using IBM Granite and ADK",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse
 )
 
-# Add CORS middleware
+# Collapse identical concurrent POSTs so duplicate bursts share one Granite run;
+# registered first so it sits inside CORS and the timing middleware
+app.add_middleware(DeduplicationMiddleware, methods=("POST",))
+
+# Add CORS middleware; explicit origins keep origin checks to a set lookup,
+# and browsers cache preflight responses for a day
+CORS_ORIGINS = tuple(
+    origin.strip()
+    for origin in os.getenv("CORS_ORIGINS", "http://localhost:3000,http://localhost:5173").split(",")
+    if origin.strip()
+)
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # Configure appropriately for production
+    allow_origins=CORS_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=("GET", "POST"),
+    allow_headers=("content-type", "authorization"),
+    max_age=86400,
 )
 
 # Initialize planner
 planner = DisasterResponsePlanner()
 
+# Cached single-record GET responses. The cache is per worker process, so only
+# records that never change once written are cached: scenarios, predictions
+# and plans by ID. Reports are left out because their pdf_path fills in after
+# rendering, and the scenario listing because a POST handled by another worker
+# could not invalidate it here
+response_cache = TTLCache(max_entries=1024, default_ttl=60.0)
+
+# Seconds a client should wait before retrying a download whose PDF is still rendering
+PDF_RETRY_AFTER = "2"
+
+# Seconds after which a report whose PDF never got a path is treated as failed,
+# e.g. when the worker process rendering it exited before recording the result
+PDF_RENDER_TIMEOUT = 600
+
+
+def _render_overdue(created_at: Optional[datetime]) -> bool:
+    """Whether a report created at this (naive UTC) time should have rendered by now"""
+    if created_at is None:
+        return False
+    age = datetime.now(timezone.utc).replace(tzinfo=None) - created_at
+    return age.total_seconds() > PDF_RENDER_TIMEOUT
+
+# Static endpoints serialize their body once at import and return it as-is
+_DISASTER_TYPES = tuple(dt.value for dt in DisasterType)
+_SEVERITY_LEVELS = tuple(sl.value for sl in SeverityLevel)
+
+_ROOT_BODY = APIResponse(
+    success=True,
+    message="RapidRelief API - AI-Powered Disaster Response Planning",
+    data={
+        "version": "1.0.0",
+        "status": "operational",
+        "features": [
+            "IBM Granite AI Integration",
+            "IBM Agent Development Kit Workflows",
+            "Resource Prediction",
+            "Allocation Planning",
+            "PDF Report Generation"
+        ]
+    }
+).model_dump_json().encode()
+
+_DISASTER_TYPES_BODY = APIResponse(
+    success=True,
+    message="Disaster types retrieved successfully",
+    data={"disaster_types": list(_DISASTER_TYPES)}
+).model_dump_json().encode()
+
+_SEVERITY_LEVELS_BODY = APIResponse(
+    success=True,
+    message="Severity levels retrieved successfully",
+    data={"severity_levels": list(_SEVERITY_LEVELS)}
+).model_dump_json().encode()
+
 # Request timing middleware
 @app.middleware("http")
 async def add_process_time_header(request, call_next):
-    start_time = time.time()
-    request_id = str(uuid.uuid4())
+    start_ns = time.perf_counter_ns()
+    request_id = new_request_id()
+    log_enabled = is_enabled_for(logging.INFO)
     
     # Log request
-    log_api_request(
-        logger, 
-        method=request.method, 
-        path=request.url.path, 
-        request_id=request_id
-    )
+    if log_enabled:
+        log_api_request(
+            logger, 
+            method=request.method, 
+            path=request.url.path, 
+            request_id=request_id
+        )
     
     response = await call_next(request)
     
     # Calculate response time
-    process_time = (time.time() - start_time) * 1000
+    elapsed_ns = time.perf_counter_ns() - start_ns
     
     # Log response
-    log_api_response(
-        logger,
-        method=request.method,
-        path=request.url.path,
-        request_id=request_id,
-        status_code=response.status_code,
-        response_time_ms=process_time
-    )
+    if log_enabled:
+        log_api_response(
+            logger,
+            method=request.method,
+            path=request.url.path,
+            request_id=request_id,
+            status_code=response.status_code,
+            response_time_ms=elapsed_ns / 1_000_000
+        )
     
-    response.headers["X-Process-Time"] = str(process_time)
+    response.headers["X-Process-Time"] = str(elapsed_ns // 1_000_000)
     response.headers["X-Request-ID"] = request_id
     return response
 
@@ -88,21 +164,7 @@ async def startup_event():
 @app.get("/", response_model=APIResponse)
 async def root():
     """Root endpoint"""
-    return APIResponse(
-        success=True,
-        message="RapidRelief API - AI-Powered Disaster Response Planning",
-        data={
-            "version": "1.0.0",
-            "status": "operational",
-            "features": [
-                "IBM Granite AI Integration",
-                "IBM Agent Development Kit Workflows",
-                "Resource Prediction",
-                "Allocation Planning",
-                "PDF Report Generation"
-            ]
-        }
-    )
+    return Response(_ROOT_BODY, media_type="application/json")
 
 
 @app.get("/health", response_model=APIResponse)
@@ -116,19 +178,19 @@ async def health_check():
 
 
 @app.post("/predict", response_model=APIResponse)
-async def predict_resources(scenario: DisasterScenario):
+async def predict_resources(scenario: DisasterScenario, db: Session = Depends(get_db)):
     """Predict resource needs for a disaster scenario using IBM Granite"""
     try:
         logger.info("Resource prediction request received", 
                    disaster_type=scenario.disaster_type,
                    severity=scenario.severity)
         
-        # Convert Pydantic model to dict
-        scenario_data = scenario.dict()
-        scenario_data['id'] = str(uuid.uuid4())
+        # Dump once in JSON mode so enums reach the Granite prompts as plain strings
+        scenario_data = scenario.model_dump(mode="json")
+        scenario_data['id'] = new_id()
         
         # Call planner for prediction
-        prediction_result = await planner.predict_resources(scenario_data)
+        prediction_result = await planner.predict_resources(scenario_data, db)
         
         return APIResponse(
             success=True,
@@ -142,24 +204,25 @@ async def predict_resources(scenario: DisasterScenario):
 
 
 @app.post("/plan", response_model=APIResponse)
-async def generate_allocation_plan(scenario: DisasterScenario):
+async def generate_allocation_plan(scenario: DisasterScenario, db: Session = Depends(get_db)):
     """Generate optimized allocation plan using IBM Granite + ADK"""
     try:
         logger.info("Allocation plan request received", 
                    disaster_type=scenario.disaster_type,
                    severity=scenario.severity)
         
-        # Convert Pydantic model to dict
-        scenario_data = scenario.dict()
-        scenario_data['id'] = str(uuid.uuid4())
+        # Dump once in JSON mode so enums reach the Granite prompts as plain strings
+        scenario_data = scenario.model_dump(mode="json")
+        scenario_data['id'] = new_id()
         
         # First predict resources
-        prediction_result = await planner.predict_resources(scenario_data)
+        prediction_result = await planner.predict_resources(scenario_data, db)
         
         # Then generate allocation plan
         allocation_result = await planner.generate_allocation_plan(
             scenario_data, 
-            prediction_result['predicted_needs']
+            prediction_result['predicted_needs'],
+            db
         )
         
         return APIResponse(
@@ -177,7 +240,7 @@ async def generate_allocation_plan(scenario: DisasterScenario):
         raise HTTPException(status_code=500, detail=f"Plan generation failed: {str(e)}")
 
 
-@app.post("/report", response_model=APIResponse)
+@app.post("/report", response_model=APIResponse, status_code=202)
 async def generate_report(scenario: DisasterScenario):
     """Generate comprehensive report with narrative and PDF"""
     try:
@@ -185,13 +248,14 @@ async def generate_report(scenario: DisasterScenario):
                    disaster_type=scenario.disaster_type,
                    severity=scenario.severity)
         
-        # Convert Pydantic model to dict
-        scenario_data = scenario.dict()
-        scenario_data['id'] = str(uuid.uuid4())
+        # Dump once in JSON mode so enums reach the Granite prompts as plain strings
+        scenario_data = scenario.model_dump(mode="json")
+        scenario_data['id'] = new_id()
         
         # Execute full workflow
         workflow_result = await planner.execute_full_workflow(scenario_data)
         
+        # The PDF renders in the background; data.download_url serves it once ready
         return APIResponse(
             success=True,
             message="Comprehensive report generated successfully",
@@ -203,15 +267,147 @@ async def generate_report(scenario: DisasterScenario):
         raise HTTPException(status_code=500, detail=f"Report generation failed: {str(e)}")
 
 
+async def _predict_in_session(scenario_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Run a prediction with its own session so batch items can run concurrently"""
+    with SessionLocal() as db:
+        return await planner.predict_resources(scenario_data, db)
+
+
+BatchStep = Callable[[], Awaitable[Dict[str, Any]]]
+
+
+async def _batch_predict(scenario_data: Dict[str, Any], prediction: BatchStep,
+                         workflow: BatchStep) -> Tuple[int, str, Dict[str, Any]]:
+    return 200, "Resource prediction completed successfully", await prediction()
+
+
+async def _batch_plan(scenario_data: Dict[str, Any], prediction: BatchStep,
+                      workflow: BatchStep) -> Tuple[int, str, Dict[str, Any]]:
+    prediction_result = await prediction()
+    with SessionLocal() as db:
+        allocation_result = await planner.generate_allocation_plan(
+            scenario_data,
+            prediction_result['predicted_needs'],
+            db
+        )
+    return 200, "Allocation plan generated successfully", {
+        "scenario_id": scenario_data['id'],
+        "prediction": prediction_result,
+        "allocation": allocation_result
+    }
+
+
+async def _batch_report(scenario_data: Dict[str, Any], prediction: BatchStep,
+                        workflow: BatchStep) -> Tuple[int, str, Dict[str, Any]]:
+    return 202, "Comprehensive report generated successfully", await workflow()
+
+
+# Batch items running at once per /batch call; each /predict and /plan item
+# opens its own database session, so this keeps one large batch from
+# draining the connection pool for every other request
+BATCH_CONCURRENCY = 8
+
+# Sub-request handlers reachable through /batch
+_BATCH_ROUTES = {
+    "/predict": _batch_predict,
+    "/plan": _batch_plan,
+    "/report": _batch_report,
+}
+
+
+@app.post("/batch", response_model=BatchResponse)
+async def run_batch(batch_request: BatchRequest):
+    """Run several /predict, /plan and /report calls in a single round-trip"""
+    # Items with identical scenario bodies share one scenario ID and one
+    # Granite prediction, so /predict and /plan for a scenario predict once
+    scenario_ids: Dict[bytes, str] = {}
+    predictions: Dict[str, asyncio.Task] = {}
+    slots = asyncio.Semaphore(BATCH_CONCURRENCY)
+    
+    def parse_item(item: BatchRequestItem) -> Union[BatchResponseItem, Dict[str, Any]]:
+        """Validate one item, returning its scenario data or an error response"""
+        if item.url not in _BATCH_ROUTES:
+            return BatchResponseItem(id=item.id, status=404, body=APIResponse(
+                success=False, message="Resource not found", error=f"Unknown batch URL: {item.url}"
+            ))
+        if item.method.upper() != "POST":
+            return BatchResponseItem(id=item.id, status=405, body=APIResponse(
+                success=False, message="Method not allowed", error=f"{item.url} only accepts POST"
+            ))
+        
+        try:
+            scenario = DisasterScenario.model_validate(item.body)
+        except ValidationError as e:
+            return BatchResponseItem(id=item.id, status=422, body=APIResponse(
+                success=False, message="Invalid scenario data", error=str(e)
+            ))
+        scenario_data = scenario.model_dump(mode="json")
+        fingerprint = orjson.dumps(scenario_data, option=orjson.OPT_SORT_KEYS)
+        scenario_data['id'] = scenario_ids.setdefault(fingerprint, new_id())
+        return scenario_data
+    
+    # Validate every item up front so the /report items are known before any
+    # runs; several of them share one batched workflow (one Granite request per
+    # stage and one bulk insert) instead of running a workflow each
+    parsed = [parse_item(item) for item in batch_request.requests]
+    report_indexes: Dict[int, int] = {}
+    report_scenarios: List[Dict[str, Any]] = []
+    for position, (item, scenario_data) in enumerate(zip(batch_request.requests, parsed)):
+        if item.url == "/report" and isinstance(scenario_data, dict):
+            report_indexes[position] = len(report_scenarios)
+            report_scenarios.append(scenario_data)
+    reports = (
+        asyncio.ensure_future(planner.execute_full_workflow_batch(report_scenarios))
+        if len(report_scenarios) > 1 else None
+    )
+    
+    async def run_item(position: int, item: BatchRequestItem,
+                       scenario_data: Union[BatchResponseItem, Dict[str, Any]]) -> BatchResponseItem:
+        if isinstance(scenario_data, BatchResponseItem):
+            return scenario_data
+        
+        def prediction() -> Awaitable[Dict[str, Any]]:
+            task = predictions.get(scenario_data['id'])
+            if task is None:
+                task = predictions[scenario_data['id']] = asyncio.ensure_future(_predict_in_session(scenario_data))
+            return task
+        
+        async def workflow() -> Dict[str, Any]:
+            if reports is None:
+                return await planner.execute_full_workflow(scenario_data)
+            return (await reports)[report_indexes[position]]
+        
+        try:
+            async with slots:
+                status, message, data = await _BATCH_ROUTES[item.url](scenario_data, prediction, workflow)
+        except Exception as e:
+            logger.error("Batch item failed", error=str(e), item_id=item.id, url=item.url)
+            return BatchResponseItem(id=item.id, status=500, body=APIResponse(
+                success=False, message="Internal server error", error=str(e)
+            ))
+        
+        return BatchResponseItem(id=item.id, status=status, body=APIResponse(
+            success=True, message=message, data=data
+        ))
+    
+    logger.info("Batch request received", batch_size=len(batch_request.requests))
+    responses = await asyncio.gather(*(
+        run_item(position, item, scenario_data)
+        for position, (item, scenario_data) in enumerate(zip(batch_request.requests, parsed))
+    ))
+    return BatchResponse(responses=responses)
+
+
 @app.get("/scenarios", response_model=APIResponse)
-async def get_scenarios():
-    """Get all disaster scenarios"""
+async def get_scenarios(limit: int = Query(50, ge=1, le=500), offset: int = Query(0, ge=0),
+                        db: Session = Depends(get_db)):
+    """Get a page of disaster scenarios, newest first"""
     try:
-        scenarios = await planner.get_all_scenarios()
+        scenarios = await planner.get_all_scenarios(db, limit=limit, offset=offset)
         return APIResponse(
             success=True,
             message=f"Retrieved {len(scenarios)} scenarios",
-            data={"scenarios": scenarios}
+            data={"scenarios": scenarios, "limit": limit, "offset": offset}
         )
     except Exception as e:
         logger.error("Failed to retrieve scenarios", error=str(e))
@@ -219,10 +415,11 @@ async def get_scenarios():
 
 
 @app.get("/scenarios/{scenario_id}", response_model=APIResponse)
-async def get_scenario(scenario_id: str):
+@cached_response(response_cache)
+async def get_scenario(scenario_id: str, db: Session = Depends(get_db)):
     """Get specific scenario by ID"""
     try:
-        scenario = await planner.get_scenario_by_id(scenario_id)
+        scenario = await planner.get_scenario_by_id(scenario_id, db)
         if not scenario:
             raise HTTPException(status_code=404, detail="Scenario not found")
         
@@ -239,10 +436,11 @@ async def get_scenario(scenario_id: str):
 
 
 @app.get("/predictions/{prediction_id}", response_model=APIResponse)
-async def get_prediction(prediction_id: str):
+@cached_response(response_cache)
+async def get_prediction(prediction_id: str, db: Session = Depends(get_db)):
     """Get specific prediction by ID"""
     try:
-        prediction = await planner.get_prediction_by_id(prediction_id)
+        prediction = await planner.get_prediction_by_id(prediction_id, db)
         if not prediction:
             raise HTTPException(status_code=404, detail="Prediction not found")
         
@@ -259,10 +457,11 @@ async def get_prediction(prediction_id: str):
 
 
 @app.get("/plans/{plan_id}", response_model=APIResponse)
-async def get_plan(plan_id: str):
+@cached_response(response_cache)
+async def get_plan(plan_id: str, db: Session = Depends(get_db)):
     """Get specific plan by ID"""
     try:
-        plan = await planner.get_plan_by_id(plan_id)
+        plan = await planner.get_plan_by_id(plan_id, db)
         if not plan:
             raise HTTPException(status_code=404, detail="Plan not found")
         
@@ -279,10 +478,10 @@ async def get_plan(plan_id: str):
 
 
 @app.get("/reports/{report_id}", response_model=APIResponse)
-async def get_report(report_id: str):
+async def get_report(report_id: str, db: Session = Depends(get_db)):
     """Get specific report by ID"""
     try:
-        report = await planner.get_report_by_id(report_id)
+        report = await planner.get_report_by_id(report_id, db)
         if not report:
             raise HTTPException(status_code=404, detail="Report not found")
         
@@ -299,19 +498,50 @@ async def get_report(report_id: str):
 
 
 @app.get("/download/{report_id}")
-async def download_report(report_id: str):
+async def download_report(report_id: str, db: Session = Depends(get_db)):
     """Download PDF report"""
     try:
-        report = await planner.get_report_by_id(report_id)
+        report = await planner.get_report_by_id(report_id, db)
         if not report:
             raise HTTPException(status_code=404, detail="Report not found")
         
         pdf_path = report['pdf_path']
-        if not os.path.exists(pdf_path):
+        # A render that failed, or that never finished because its worker went
+        # away, will not produce a PDF; say so instead of asking for a retry
+        if pdf_path == PDF_RENDER_FAILED or (pdf_path is None and _render_overdue(report['created_at'])):
+            return ORJSONResponse(
+                status_code=500,
+                content=APIResponse(
+                    success=False,
+                    message="PDF report generation failed",
+                    error="PDF rendering failed",
+                    data={"report_id": report_id}
+                ).model_dump()
+            )
+        
+        # Not rendered yet: fail the download cleanly and say when to retry,
+        # so clients never save this JSON body as the PDF
+        if pdf_path is None:
+            return ORJSONResponse(
+                status_code=409,
+                headers={"Retry-After": PDF_RETRY_AFTER},
+                content=APIResponse(
+                    success=False,
+                    message="PDF report is still being generated",
+                    error="PDF not ready",
+                    data={"report_id": report_id, "download_url": f"/download/{report_id}"}
+                ).model_dump()
+            )
+        
+        # One stat both checks the file exists and feeds FileResponse's headers
+        try:
+            stat_result = os.stat(pdf_path)
+        except FileNotFoundError:
             raise HTTPException(status_code=404, detail="PDF file not found")
         
         return FileResponse(
             pdf_path,
+            stat_result=stat_result,
             media_type='application/pdf',
             filename=f"disaster_response_report_{report_id}.pdf"
         )
@@ -325,42 +555,50 @@ async def download_report(report_id: str):
 @app.get("/disaster-types", response_model=APIResponse)
 async def get_disaster_types():
     """Get available disaster types"""
-    return APIResponse(
-        success=True,
-        message="Disaster types retrieved successfully",
-        data={"disaster_types": [dt.value for dt in DisasterType]}
-    )
+    return Response(_DISASTER_TYPES_BODY, media_type="application/json")
 
 
 @app.get("/severity-levels", response_model=APIResponse)
 async def get_severity_levels():
     """Get available severity levels"""
-    return APIResponse(
-        success=True,
-        message="Severity levels retrieved successfully",
-        data={"severity_levels": [sl.value for sl in SeverityLevel]}
-    )
+    return Response(_SEVERITY_LEVELS_BODY, media_type="application/json")
 
 
 # Error handlers
 @app.exception_handler(404)
 async def not_found_handler(request, exc):
-    return APIResponse(
-        success=False,
-        message="Resource not found",
-        error="The requested resource was not found"
+    return ORJSONResponse(
+        status_code=404,
+        content=APIResponse(
+            success=False,
+            message="Resource not found",
+            error="The requested resource was not found"
+        ).model_dump()
     )
 
 
 @app.exception_handler(500)
 async def internal_error_handler(request, exc):
-    return APIResponse(
-        success=False,
-        message="Internal server error",
-        error="An unexpected error occurred"
+    return ORJSONResponse(
+        status_code=500,
+        content=APIResponse(
+            success=False,
+            message="Internal server error",
+            error="An unexpected error occurred"
+        ).model_dump()
     )
 
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # Workers need an import string; the timing middleware already logs each request
+    uvicorn.run(
+        "app.main:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1)),
+        loop="uvloop",
+        http="httptools",
+        access_log=False,
+        log_level="warning"
+    )
@@ -1,8 +1,11 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 from enum import Enum
 
+# Models are immutable once validated and ignore unknown fields
+_MODEL_CONFIG = ConfigDict(extra="ignore", frozen=True)
+
 
 class DisasterType(str, Enum):
     EARTHQUAKE = "earthquake"
@@ -21,6 +24,8 @@ class SeverityLevel(str, Enum):
 
 
 class Location(BaseModel):
+    model_config = _MODEL_CONFIG
+    
     latitude: float = Field(..., ge=-90, le=90)
     longitude: float = Field(..., ge=-180, le=180)
     city: str
@@ -30,6 +35,8 @@ class Location(BaseModel):
 
 
 class DisasterScenario(BaseModel):
+    model_config = _MODEL_CONFIG
+    
     disaster_type: DisasterType
     severity: SeverityLevel
     location: Location
@@ -42,6 +49,8 @@ class DisasterScenario(BaseModel):
 
 
 class ResourceNeed(BaseModel):
+    model_config = _MODEL_CONFIG
+    
     resource_type: str
     quantity: int
     priority: str
@@ -50,6 +59,8 @@ class ResourceNeed(BaseModel):
 
 
 class PredictionResponse(BaseModel):
+    model_config = _MODEL_CONFIG
+    
     scenario_id: str
     predicted_needs: List[ResourceNeed]
     confidence_score: float = Field(..., ge=0, le=1)
@@ -59,6 +70,8 @@ class PredictionResponse(BaseModel):
 
 
 class AllocationPlan(BaseModel):
+    model_config = _MODEL_CONFIG
+    
     plan_id: str
     scenario_id: str
     resource_allocations: List[ResourceNeed]
@@ -70,6 +83,8 @@ class AllocationPlan(BaseModel):
 
 
 class ReportData(BaseModel):
+    model_config = _MODEL_CONFIG
+    
     report_id: str
     scenario_id: str
     prediction_id: str
@@ -82,7 +97,42 @@ class ReportData(BaseModel):
 
 
 class APIResponse(BaseModel):
+    model_config = _MODEL_CONFIG
+    
     success: bool
     message: str
     data: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
+
+
+class BatchRequestItem(BaseModel):
+    model_config = _MODEL_CONFIG
+    
+    id: str
+    url: str
+    method: str = "POST"
+    body: Dict[str, Any] = Field(default_factory=dict)
+
+
+# Largest number of sub-requests accepted in one /batch call
+MAX_BATCH_ITEMS = 50
+
+
+class BatchRequest(BaseModel):
+    model_config = _MODEL_CONFIG
+    
+    requests: List[BatchRequestItem] = Field(..., max_length=MAX_BATCH_ITEMS)
+
+
+class BatchResponseItem(BaseModel):
+    model_config = _MODEL_CONFIG
+    
+    id: str
+    status: int
+    body: APIResponse
+
+
+class BatchResponse(BaseModel):
+    model_config = _MODEL_CONFIG
+    
+    responses: List[BatchResponseItem]
@@ -0,0 +1,103 @@
+import functools
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """Thread-safe in-process LRU cache with per-entry expiry"""
+
+    def __init__(self, max_entries: int = 1024, default_ttl: float = 300.0):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by every clear so writers can tell their value predates it
+        self.generation = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None,
+            generation: Optional[int] = None) -> None:
+        """Store a value, evicting the least recently used entry when full"""
+        expires_at = time.monotonic() + (self.default_ttl if ttl is None else ttl)
+        with self._lock:
+            # A value computed before the last clear may already be stale
+            if generation is not None and generation != self.generation:
+                return
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every cached entry"""
+        with self._lock:
+            self._entries.clear()
+            self.generation += 1
+
+
+# Time-to-live per prompt kind, in seconds
+PROMPT_CACHE_TTLS: Dict[str, float] = {
+    "predict": 60 * 60,
+    "allocation": 60 * 60,
+    "narrative": 24 * 60 * 60,
+}
+
+
+class PromptCache:
+    """Exact-match cache of Granite responses keyed by prompt hash"""
+
+    def __init__(self, max_entries: int = 1024, ttls: Optional[Dict[str, float]] = None):
+        self.ttls = ttls or PROMPT_CACHE_TTLS
+        self._cache = TTLCache(max_entries=max_entries)
+
+    @staticmethod
+    def _key(prompt: str) -> str:
+        return hashlib.sha1(prompt.encode()).hexdigest()
+
+    def get(self, prompt: str) -> Optional[Dict[str, Any]]:
+        """Return the cached response for a prompt, if any"""
+        return self._cache.get(self._key(prompt))
+
+    def put(self, prompt: str, response: Dict[str, Any], kind: str) -> None:
+        """Cache a response using the TTL configured for its prompt kind"""
+        self._cache.set(self._key(prompt), response, ttl=self.ttls.get(kind))
+
+
+def cached_response(cache: TTLCache, ttl: Optional[float] = None,
+                    exclude: Tuple[str, ...] = ("db",)) -> Callable:
+    """Cache an async endpoint's result keyed on its name and keyword arguments"""
+    def decorator(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            key = (func.__name__,) + tuple(sorted(
+                (name, value) for name, value in kwargs.items() if name not in exclude
+            ))
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+            
+            # A clear while the endpoint runs means a write may have landed
+            # after our read, so that result is returned but not cached
+            generation = cache.generation
+            result = await func(*args, **kwargs)
+            cache.set(key, result, ttl=ttl, generation=generation)
+            return result
+        return wrapper
+    return decorator
@@ -0,0 +1,27 @@
+from typing import Any, Dict, List
+
+# Share of the plan's total cost attributed to each overhead category
+LOGISTICS_SHARE = 0.3
+COORDINATION_SHARE = 0.2
+
+
+def cost_breakdowns(medical_costs: List[float], total_costs: List[float]) -> List[Dict[str, float]]:
+    """Roll up cost breakdowns for many plans in a single pass over flat cost lists"""
+    return [
+        {
+            "medical_supplies": medical,
+            "logistics": total * LOGISTICS_SHARE,
+            "coordination": total * COORDINATION_SHARE
+        }
+        for medical, total in zip(medical_costs, total_costs)
+    ]
+
+
+def medical_cost(prediction_result: Dict[str, Any]) -> float:
+    """Estimated cost of the first predicted need, used as the medical line item"""
+    return prediction_result.get('predicted_needs', [{}])[0].get('estimated_cost', 0)
+
+
+def cost_breakdown(prediction_result: Dict[str, Any], allocation_result: Dict[str, Any]) -> Dict[str, float]:
+    """Cost breakdown for a single prediction and allocation plan"""
+    return cost_breakdowns([medical_cost(prediction_result)], [allocation_result.get('total_cost', 0)])[0]
@@ -0,0 +1,39 @@
+import itertools
+import os
+import time
+import uuid
+from typing import List
+
+
+def new_id() -> str:
+    """Random UUID4 as 32 hex characters, skipping the dashed string form"""
+    return uuid.uuid4().hex
+
+
+def new_ids(n: int) -> List[str]:
+    """Generate n random UUID4 hex strings from a single urandom read"""
+    raw = os.urandom(16 * n)
+    return [uuid.UUID(bytes=raw[i * 16:(i + 1) * 16], version=4).hex for i in range(n)]
+
+
+def _request_id_prefix() -> str:
+    return f"{os.getpid():x}-{int(time.time()):x}-"
+
+
+# Per-process prefix plus counter: unique across workers, no urandom read per request
+_RID_PREFIX = _request_id_prefix()
+_rid_counter = itertools.count()
+
+
+def _reset_request_ids() -> None:
+    global _RID_PREFIX, _rid_counter
+    _RID_PREFIX = _request_id_prefix()
+    _rid_counter = itertools.count()
+
+
+os.register_at_fork(after_in_child=_reset_request_ids)
+
+
+def new_request_id() -> str:
+    """Cheap per-process request ID: hex pid, start time and a running counter"""
+    return _RID_PREFIX + format(next(_rid_counter), "x")
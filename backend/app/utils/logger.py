@@ -1,49 +1,292 @@
 import structlog
 import sys
+import os
+import atexit
 import logging
-from datetime import datetime
-from typing import Any, Dict
+import orjson
+import queue
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from structlog.typing import FilteringBoundLogger
+from typing import Any, Dict, Optional
 
+# Background thread that drains queued stdlib log records to stdout
+_listener: Optional[QueueListener] = None
 
-def setup_logging(log_level: str = "INFO") -> None:
+# Configured log level name, e.g. INFO or WARNING
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+
+# Minimum level emitted by application loggers
+_log_level: int = logging.INFO
+
+# Largest number of buffers a single writev call accepts
+try:
+    _IOV_MAX = os.sysconf("SC_IOV_MAX")
+except (AttributeError, ValueError, OSError):
+    _IOV_MAX = 1024
+if _IOV_MAX <= 0:
+    _IOV_MAX = 1024
+
+# Background writer that batches rendered application log lines
+_batch_writer: Optional["BatchWriter"] = None
+
+
+class BatchWriter:
+    """Buffers log lines and flushes them to a file descriptor from a daemon thread"""
+    
+    def __init__(self, fd: int, max_bytes: int = 64 * 1024, interval: float = 0.005,
+                 max_buffered_bytes: int = 8 * 1024 * 1024):
+        self.fd = fd
+        self.max_bytes = max_bytes
+        self.interval = interval
+        self.max_buffered_bytes = max_buffered_bytes
+        # Lines lost to a full buffer or a failed write
+        self.dropped = 0
+        self._reported = 0
+        self._direct = False
+        self._start()
+    
+    def _start(self) -> None:
+        self._buffer: deque = deque()
+        self._size = 0
+        self._stopped = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+    
+    def write(self, data: bytes) -> None:
+        """Queue one line; wakes the flusher on the first line or a full buffer"""
+        if self._direct:
+            self._flush([data])
+            return
+        with self._cond:
+            # A reader that stops draining the fd must not grow memory without bound
+            if self._size + len(data) > self.max_buffered_bytes:
+                self.dropped += 1
+                return
+            self._buffer.append(data)
+            self._size += len(data)
+            if len(self._buffer) == 1 or self._size >= self.max_bytes:
+                self._cond.notify()
+    
+    def _take(self) -> list:
+        chunks = list(self._buffer)
+        self._buffer.clear()
+        self._size = 0
+        # Report lines lost since the last batch as soon as output flows again
+        if self.dropped != self._reported:
+            chunks.append(_dropped_notice(self.dropped - self._reported))
+            self._reported = self.dropped
+        return chunks
+    
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._buffer and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                # Give the batch a moment to fill before paying for the syscall
+                if self._size < self.max_bytes:
+                    self._cond.wait(self.interval)
+                chunks = self._take()
+            self._flush(chunks)
+    
+    def _flush(self, chunks: list) -> None:
+        start = 0
+        while start < len(chunks):
+            try:
+                # writev rejects more than IOV_MAX buffers in one call
+                written = os.writev(self.fd, chunks[start:start + _IOV_MAX])
+            except OSError:
+                # Nowhere left to report it, e.g. stdout closed under us
+                with self._cond:
+                    self.dropped += len(chunks) - start
+                return
+            # Skip fully written chunks and trim a partially written one
+            while start < len(chunks) and written >= len(chunks[start]):
+                written -= len(chunks[start])
+                start += 1
+            if written:
+                chunks[start] = chunks[start][written:]
+    
+    def stop(self) -> None:
+        """Stop the flusher thread and write out anything still buffered"""
+        if self._direct:
+            return
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        self._thread.join()
+        self._flush(self._take())
+    
+    def after_fork(self) -> None:
+        """Write straight through in a forked child instead of batching"""
+        # The flusher thread does not survive fork, and forked pool workers
+        # leave through os._exit without running atexit, so anything buffered
+        # in the child could be lost. The parent's pending lines stay with the
+        # parent, which flushes them itself
+        self._buffer = deque()
+        self._size = 0
+        self._stopped = True
+        self._direct = True
+        self._cond = threading.Condition()
+
+
+def _dropped_notice(count: int) -> bytes:
+    """Log line recording how many lines the batch writer had to drop"""
+    return orjson.dumps({
+        "dropped": count,
+        "event": "Log lines dropped",
+        "logger": __name__,
+        "level": "warning",
+        "timestamp": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+    }) + b"\n"
+
+
+class NamedBytesLogger(structlog.BytesLogger):
+    """BytesLogger that remembers the name it was requested under"""
+    
+    __slots__ = ("name",)
+    
+    def __init__(self, name: Optional[str] = None):
+        super().__init__()
+        self.name = name
+
+
+class NamedBytesLoggerFactory:
+    """Passes get_logger's name through to the logger, keeping proxies lazy"""
+    
+    def __call__(self, *args: Any) -> NamedBytesLogger:
+        return NamedBytesLogger(args[0] if args else None)
+
+
+class BatchingBytesLogger:
+    """Named structlog logger that hands rendered events to a BatchWriter"""
+    
+    __slots__ = ("_writer", "name")
+    
+    def __init__(self, writer: BatchWriter, name: Optional[str] = None):
+        self._writer = writer
+        self.name = name
+    
+    def msg(self, message: bytes) -> None:
+        self._writer.write(message + b"\n")
+    
+    log = debug = info = warn = warning = msg
+    fatal = failure = err = error = critical = exception = msg
+
+
+class BatchingBytesLoggerFactory:
+    """Gives every named logger the same batching writer"""
+    
+    def __init__(self, writer: BatchWriter):
+        self._writer = writer
+    
+    def __call__(self, *args: Any) -> BatchingBytesLogger:
+        return BatchingBytesLogger(self._writer, args[0] if args else None)
+
+
+def _after_fork_in_child() -> None:
+    if _batch_writer is not None:
+        _batch_writer.after_fork()
+
+
+os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def _logger_factory() -> Any:
+    """Batch writes to stdout when it is a real descriptor that supports writev"""
+    global _batch_writer
+    if _batch_writer is not None:
+        # Loggers cached by an earlier setup keep writing through it
+        return BatchingBytesLoggerFactory(_batch_writer)
+    
+    try:
+        fd = sys.stdout.fileno()
+    except (AttributeError, OSError, ValueError):
+        # e.g. stdout captured by a test runner
+        return NamedBytesLoggerFactory()
+    if not hasattr(os, "writev"):
+        return NamedBytesLoggerFactory()
+    
+    sys.stdout.flush()
+    _batch_writer = BatchWriter(fd)
+    return BatchingBytesLoggerFactory(_batch_writer)
+
+
+def _add_logger_name(logger: Any, method_name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+    if logger.name is not None:
+        event_dict["logger"] = logger.name
+    return event_dict
+
+
+def setup_logging(log_level: str = LOG_LEVEL) -> None:
     """Setup structured JSON logging for the application"""
+    global _listener, _log_level
+    _log_level = getattr(logging, log_level.upper())
     
-    # Configure structlog
+    # Application loggers render straight to bytes with orjson; disabled
+    # levels are no-ops on the filtering wrapper, before any processor runs
     structlog.configure(
         processors=[
-            structlog.stdlib.filter_by_level,
-            structlog.stdlib.add_logger_name,
-            structlog.stdlib.add_log_level,
-            structlog.stdlib.PositionalArgumentsFormatter(),
-            structlog.processors.TimeStamper(fmt="iso"),
+            structlog.contextvars.merge_contextvars,
+            _add_logger_name,
+            structlog.processors.add_log_level,
+            structlog.processors.TimeStamper(fmt="iso", utc=True),
             structlog.processors.StackInfoRenderer(),
             structlog.processors.format_exc_info,
-            structlog.processors.UnicodeDecoder(),
-            structlog.processors.JSONRenderer()
+            structlog.processors.JSONRenderer(serializer=orjson.dumps)
         ],
         context_class=dict,
-        logger_factory=structlog.stdlib.LoggerFactory(),
-        wrapper_class=structlog.stdlib.BoundLogger,
+        logger_factory=_logger_factory(),
+        wrapper_class=structlog.make_filtering_bound_logger(_log_level),
         cache_logger_on_first_use=True,
     )
     
-    # Configure standard library logging
-    logging.basicConfig(
-        format="%(message)s",
-        stream=sys.stdout,
-        level=getattr(logging, log_level.upper()),
-    )
+    # Standard library logging only carries third-party output now; records
+    # are enqueued on the calling thread and written by the listener thread
+    if _listener is not None:
+        _listener.stop()
+    
+    log_queue: queue.Queue = queue.Queue(-1)
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter("%(message)s"))
+    _listener = QueueListener(log_queue, stream_handler)
+    _listener.start()
+    
+    root = logging.getLogger()
+    root.handlers = [QueueHandler(log_queue)]
+    root.setLevel(_log_level)
+
+
+@atexit.register
+def _flush_logging() -> None:
+    """Drain any queued log records before the interpreter exits"""
+    if _listener is not None:
+        _listener.stop()
+    if _batch_writer is not None:
+        _batch_writer.stop()
+
+
+def is_enabled_for(level: int) -> bool:
+    """Whether application loggers emit events at this level"""
+    return level >= _log_level
 
 
-def get_logger(name: str = None) -> structlog.BoundLogger:
+def get_logger(name: str = None) -> FilteringBoundLogger:
     """Get a structured logger instance"""
+    # The name travels as a factory argument rather than a bound value, so
+    # module-level loggers created before setup_logging() stay lazy
     return structlog.get_logger(name)
 
 
 class LogContext:
     """Context manager for adding context to log entries"""
     
-    def __init__(self, logger: structlog.BoundLogger, **context):
+    def __init__(self, logger: FilteringBoundLogger, **context):
         self.logger = logger
         self.context = context
     
@@ -54,9 +297,11 @@ class LogContext:
         pass
 
 
-def log_api_request(logger: structlog.BoundLogger, method: str, path: str, 
+def log_api_request(logger: FilteringBoundLogger, method: str, path: str, 
                    request_id: str, user_id: str = None, **kwargs) -> None:
     """Log API request details"""
+    if _log_level > logging.INFO:
+        return
     logger.info(
         "API request",
         method=method,
@@ -67,10 +312,12 @@ def log_api_request(logger: structlog.BoundLogger, method: str, path: str,
     )
 
 
-def log_api_response(logger: structlog.BoundLogger, method: str, path: str,
+def log_api_response(logger: FilteringBoundLogger, method: str, path: str,
                     request_id: str, status_code: int, response_time_ms: float,
                     user_id: str = None, **kwargs) -> None:
     """Log API response details"""
+    if _log_level > logging.INFO:
+        return
     logger.info(
         "API response",
         method=method,
@@ -83,9 +330,11 @@ def log_api_response(logger: structlog.BoundLogger, method: str, path: str,
     )
 
 
-def log_workflow_step(logger: structlog.BoundLogger, workflow_id: str, 
+def log_workflow_step(logger: FilteringBoundLogger, workflow_id: str, 
                      step_name: str, status: str, **kwargs) -> None:
     """Log workflow step execution"""
+    if _log_level > logging.INFO:
+        return
     logger.info(
         "Workflow step",
         workflow_id=workflow_id,
@@ -95,9 +344,11 @@ def log_workflow_step(logger: structlog.BoundLogger, workflow_id: str,
     )
 
 
-def log_granite_request(logger: structlog.BoundLogger, operation: str, 
+def log_granite_request(logger: FilteringBoundLogger, operation: str, 
                        model: str, tokens_used: int = None, **kwargs) -> None:
     """Log Granite API requests"""
+    if _log_level > logging.INFO:
+        return
     logger.info(
         "Granite API request",
         operation=operation,
@@ -107,9 +358,11 @@ def log_granite_request(logger: structlog.BoundLogger, operation: str,
     )
 
 
-def log_database_operation(logger: structlog.BoundLogger, operation: str,
+def log_database_operation(logger: FilteringBoundLogger, operation: str,
                           table: str, record_id: str = None, **kwargs) -> None:
     """Log database operations"""
+    if _log_level > logging.INFO:
+        return
     logger.info(
         "Database operation",
         operation=operation,
@@ -119,9 +372,11 @@ def log_database_operation(logger: structlog.BoundLogger, operation: str,
     )
 
 
-def log_error(logger: structlog.BoundLogger, error: Exception, 
+def log_error(logger: FilteringBoundLogger, error: Exception, 
               context: Dict[str, Any] = None, **kwargs) -> None:
     """Log error with context"""
+    if _log_level > logging.ERROR:
+        return
     logger.error(
         "Application error",
         error_type=type(error).__name__,
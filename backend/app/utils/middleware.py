@@ -0,0 +1,83 @@
+import asyncio
+import hashlib
+from typing import Dict, Iterable, List, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+async def _read_body(receive: Receive) -> bytes:
+    """Drain the request body from the ASGI receive channel"""
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] != "http.request":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            break
+    return b"".join(chunks)
+
+
+def _replay(body: bytes, receive: Receive) -> Receive:
+    """Receive channel that yields an already-read body before deferring to the client"""
+    sent = False
+    
+    async def replay() -> Message:
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()
+    
+    return replay
+
+
+class DeduplicationMiddleware:
+    """Collapse identical in-flight requests onto a single execution"""
+    
+    def __init__(self, app: ASGIApp, methods: Iterable[str] = ("POST",)):
+        self.app = app
+        self.methods = frozenset(methods)
+        self._pending: Dict[bytes, asyncio.Future] = {}
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in self.methods:
+            await self.app(scope, receive, send)
+            return
+        
+        body = await _read_body(receive)
+        key = hashlib.blake2b(
+            b"\0".join((scope["method"].encode(), scope["path"].encode(), scope.get("query_string", b""), body)),
+            digest_size=16
+        ).digest()
+        
+        pending = self._pending.get(key)
+        if pending is not None:
+            # Replay the first request's response; if it failed, run this one normally
+            messages: Optional[List[Message]] = await asyncio.shield(pending)
+            if messages is not None:
+                for message in messages:
+                    await send(message)
+                return
+            await self.app(scope, _replay(body, receive), send)
+            return
+        
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        messages = []
+        
+        async def capture(message: Message) -> None:
+            messages.append(message)
+            await send(message)
+        
+        try:
+            await self.app(scope, _replay(body, receive), capture)
+        except BaseException:
+            future.set_result(None)
+            raise
+        else:
+            # Server errors are not shared; waiting requests get their own attempt
+            failed = bool(messages) and messages[0].get("status", 200) >= 500
+            future.set_result(None if failed else messages)
+        finally:
+            del self._pending[key]
@@ -1,13 +1,138 @@
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle, StyleSheet1
 from reportlab.lib.units import inch
 from reportlab.lib import colors
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
+from concurrent.futures import Future, ProcessPoolExecutor
 from datetime import datetime
+import functools
+import io
+import itertools
 import os
-import uuid
-from typing import Dict, List, Any
+import time
+from typing import Dict, Iterable, List, Any, Tuple
+
+# PDF rendering is CPU-bound, so it runs in worker processes off the request path;
+# each report renders in one worker, so concurrent reports spread across them
+REPORT_WORKERS = int(os.getenv("REPORT_WORKERS", os.cpu_count() or 1))
+_PDF_POOL = ProcessPoolExecutor(max_workers=REPORT_WORKERS)
+
+# (scenario_data, prediction_result, allocation_result, narrative) for one report
+ReportArgs = Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any], str]
+
+# Generators built inside each worker process, keyed by output directory
+_WORKER_GENERATORS: Dict[str, "ReportGenerator"] = {}
+
+# Report file names: pid, per-process counter and timestamp, no urandom read
+_PID_PREFIX = f"{os.getpid():x}"
+_REPORT_COUNTER = itertools.count()
+
+
+def _reset_report_names() -> None:
+    global _PID_PREFIX, _REPORT_COUNTER
+    _PID_PREFIX = f"{os.getpid():x}"
+    _REPORT_COUNTER = itertools.count()
+
+
+# Pool workers are forked from the API process and need their own prefix
+os.register_at_fork(after_in_child=_reset_report_names)
+
+_AI_NOTICE = ("This report was generated using IBM Granite AI models and the IBM Agent "
+              "Development Kit for automated disaster response planning.")
+
+_RECOMMENDATIONS = (
+    "Immediate medical response deployment to affected areas",
+    "Establish emergency communication channels",
+    "Coordinate with local authorities and emergency services",
+    "Monitor weather conditions and adjust plans accordingly",
+    "Deploy volunteer teams according to the allocation plan",
+    "Establish supply chain coordination for resource delivery",
+    "Implement regular status reporting and progress tracking",
+    "Prepare for potential escalation scenarios"
+)
+
+_SECTION_TITLES = (
+    "Executive Summary",
+    "Disaster Scenario Details",
+    "AI-Powered Resource Predictions",
+    "Optimized Resource Allocation Plan",
+    "AI-Generated Narrative Analysis",
+    "Key Recommendations"
+)
+
+_SUBSECTION_TITLES = (
+    "Scenario Description",
+    "Predicted Resource Needs",
+    "Resource Allocations",
+    "Volunteer Assignments",
+    "Risk Assessment"
+)
+
+
+def _table_style(align: str, header_font_size: int) -> TableStyle:
+    """Grey header row over a beige gridded body"""
+    return TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), align),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), header_font_size),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ])
+
+
+# Table styles are immutable once built, so every report shares them
+_METRICS_STYLE = _table_style('LEFT', 12)
+_RESOURCE_STYLE = _table_style('CENTER', 10)
+_VOLUNTEER_STYLE = _table_style('LEFT', 10)
+
+
+# Number formats used across the report tables, with the format spec bound once
+_FMT_INT = "{:,}".format
+_FMT_MONEY = "${:,.2f}".format
+_FMT_PCT = "{:.1%}".format
+
+_RESOURCE_HEADER = ('Resource Type', 'Quantity', 'Priority', 'Cost', 'Delivery Time')
+_RESOURCE_COL_WIDTHS = [1.5*inch, 0.8*inch, 0.8*inch, 1*inch, 1*inch]
+
+
+def _resource_row(item: Dict[str, Any]) -> Tuple[str, str, str, str, str]:
+    """Format one predicted need or allocation for the resource tables"""
+    get = item.get
+    return (
+        get('resource_type', ''),
+        str(get('quantity', 0)),
+        get('priority', ''),
+        _FMT_MONEY(get('estimated_cost', 0)),
+        f"{get('delivery_time_hours', 0)} hours"
+    )
+
+
+def _render_resource_table(items: List[Dict[str, Any]]) -> Table:
+    """Build the resource table shared by the predictions and allocation sections"""
+    table = Table([_RESOURCE_HEADER, *map(_resource_row, items)], colWidths=_RESOURCE_COL_WIDTHS)
+    table.setStyle(_RESOURCE_STYLE)
+    return table
+
+
+def _render_two_col_table(header: Tuple[str, str], pairs: Iterable[Tuple[str, str]],
+                          col_widths: List[float], style: TableStyle = _METRICS_STYLE) -> Table:
+    """Build a header-plus-rows table of label/value pairs"""
+    table = Table([header, *pairs], colWidths=col_widths)
+    table.setStyle(style)
+    return table
+
+
+def _render_report(output_dir: str, scenario_data: Dict[str, Any], prediction_result: Dict[str, Any],
+                   allocation_result: Dict[str, Any], narrative: str) -> str:
+    """Render a report inside a worker process, reusing that process's generator"""
+    generator = _WORKER_GENERATORS.get(output_dir)
+    if generator is None:
+        generator = _WORKER_GENERATORS[output_dir] = ReportGenerator(output_dir)
+    return generator.generate_report(scenario_data, prediction_result, allocation_result, narrative)
 
 
 class ReportGenerator:
@@ -17,16 +142,33 @@ class ReportGenerator:
         self.output_dir = output_dir
         os.makedirs(output_dir, exist_ok=True)
         
-        # Define custom styles
-        self.styles = getSampleStyleSheet()
-        self._setup_custom_styles()
+        # Styles are shared by every generator in the process
+        self.styles = type(self)._get_styles()
+        self._setup_static_flowables()
     
-    def _setup_custom_styles(self):
+    @classmethod
+    @functools.cache
+    def _get_styles(cls) -> StyleSheet1:
+        """Build the sample stylesheet plus the report's custom styles, once"""
+        styles = getSampleStyleSheet()
+        cls._setup_custom_styles(styles)
+        return styles
+    
+    @staticmethod
+    def _add_style(styles: StyleSheet1, style: ParagraphStyle) -> None:
+        """Add a style, replacing a stock one of the same name (e.g. BodyText)"""
+        if style.name in styles:
+            styles.byName[style.name] = style
+        else:
+            styles.add(style)
+    
+    @classmethod
+    def _setup_custom_styles(cls, styles: StyleSheet1) -> None:
         """Setup custom paragraph styles for the report"""
         # Title style
-        self.styles.add(ParagraphStyle(
+        cls._add_style(styles, ParagraphStyle(
             name='CustomTitle',
-            parent=self.styles['Heading1'],
+            parent=styles['Heading1'],
             fontSize=24,
             spaceAfter=30,
             alignment=TA_CENTER,
@@ -34,9 +176,9 @@ class ReportGenerator:
         ))
         
         # Section header style
-        self.styles.add(ParagraphStyle(
+        cls._add_style(styles, ParagraphStyle(
             name='SectionHeader',
-            parent=self.styles['Heading2'],
+            parent=styles['Heading2'],
             fontSize=16,
             spaceAfter=12,
             spaceBefore=20,
@@ -44,9 +186,9 @@ class ReportGenerator:
         ))
         
         # Subsection header style
-        self.styles.add(ParagraphStyle(
+        cls._add_style(styles, ParagraphStyle(
             name='SubsectionHeader',
-            parent=self.styles['Heading3'],
+            parent=styles['Heading3'],
             fontSize=14,
             spaceAfter=8,
             spaceBefore=12,
@@ -54,18 +196,18 @@ class ReportGenerator:
         ))
         
         # Body text style
-        self.styles.add(ParagraphStyle(
+        cls._add_style(styles, ParagraphStyle(
             name='BodyText',
-            parent=self.styles['Normal'],
+            parent=styles['Normal'],
             fontSize=11,
             spaceAfter=6,
             alignment=TA_LEFT
         ))
         
         # Highlight style
-        self.styles.add(ParagraphStyle(
+        cls._add_style(styles, ParagraphStyle(
             name='Highlight',
-            parent=self.styles['Normal'],
+            parent=styles['Normal'],
             fontSize=11,
             spaceAfter=6,
             alignment=TA_LEFT,
@@ -73,61 +215,74 @@ class ReportGenerator:
             backColor=colors.lightblue
         ))
     
+    def _setup_static_flowables(self):
+        """Parse the fixed report text once; every report shares these flowables"""
+        self._title = Paragraph("RapidRelief Disaster Response Report", self.styles['CustomTitle'])
+        self._ai_notice = Paragraph(_AI_NOTICE, self.styles['Highlight'])
+        self._headers = {title: Paragraph(title, self.styles['SectionHeader']) for title in _SECTION_TITLES}
+        self._headers.update(
+            (title, Paragraph(title, self.styles['SubsectionHeader'])) for title in _SUBSECTION_TITLES
+        )
+        self._recommendation_flowables = [
+            Paragraph(f"{i}. {rec}", self.styles['BodyText'])
+            for i, rec in enumerate(_RECOMMENDATIONS, 1)
+        ]
+    
     def generate_report(self, scenario_data: Dict[str, Any], prediction_result: Dict[str, Any], 
                        allocation_result: Dict[str, Any], narrative: str) -> str:
         """Generate a comprehensive PDF report"""
         
         # Generate unique filename
-        report_id = str(uuid.uuid4())
+        report_id = f"{_PID_PREFIX}_{next(_REPORT_COUNTER):x}_{time.time_ns():x}"
         filename = f"disaster_response_report_{report_id}.pdf"
         filepath = os.path.join(self.output_dir, filename)
         
-        # Create PDF document
-        doc = SimpleDocTemplate(filepath, pagesize=A4, rightMargin=72, leftMargin=72, 
+        # Create PDF document; it renders into memory and is written out in one go
+        buffer = io.BytesIO()
+        doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=72, leftMargin=72, 
                               topMargin=72, bottomMargin=18)
         
-        # Build story (content)
+        # Build story (content): one page-broken section after another
+        sections = (
+            lambda: self._create_title_page(scenario_data),
+            lambda: self._create_executive_summary(scenario_data, prediction_result, allocation_result),
+            lambda: self._create_scenario_details(scenario_data),
+            lambda: self._create_resource_predictions(prediction_result),
+            lambda: self._create_allocation_plan(allocation_result),
+            lambda: self._create_narrative_analysis(narrative),
+            lambda: self._create_recommendations(prediction_result, allocation_result)
+        )
         story = []
-        
-        # Add title page
-        story.extend(self._create_title_page(scenario_data))
-        story.append(PageBreak())
-        
-        # Add executive summary
-        story.extend(self._create_executive_summary(scenario_data, prediction_result, allocation_result))
-        story.append(PageBreak())
-        
-        # Add scenario details
-        story.extend(self._create_scenario_details(scenario_data))
-        story.append(PageBreak())
-        
-        # Add resource predictions
-        story.extend(self._create_resource_predictions(prediction_result))
-        story.append(PageBreak())
-        
-        # Add allocation plan
-        story.extend(self._create_allocation_plan(allocation_result))
-        story.append(PageBreak())
-        
-        # Add narrative analysis
-        story.extend(self._create_narrative_analysis(narrative))
-        story.append(PageBreak())
-        
-        # Add recommendations
-        story.extend(self._create_recommendations(prediction_result, allocation_result))
+        for section in sections:
+            if story:
+                story.append(PageBreak())
+            story.extend(section())
         
         # Build PDF
         doc.build(story)
+        with open(filepath, "wb", buffering=0) as f:
+            f.write(buffer.getbuffer())
         
         return filepath
     
+    def submit_report(self, scenario_data: Dict[str, Any], prediction_result: Dict[str, Any],
+                      allocation_result: Dict[str, Any], narrative: str) -> Future:
+        """Render a PDF report in the background, returning a future for its path"""
+        return _PDF_POOL.submit(
+            _render_report, self.output_dir,
+            scenario_data, prediction_result, allocation_result, narrative
+        )
+    
+    def submit_batch(self, reports: Iterable[ReportArgs]) -> List[Future]:
+        """Queue several renders on the pool, returning one future per report in order"""
+        return [self.submit_report(*report) for report in reports]
+    
     def _create_title_page(self, scenario_data: Dict[str, Any]) -> List:
         """Create the title page"""
         elements = []
         
         # Title
-        title = Paragraph("RapidRelief Disaster Response Report", self.styles['CustomTitle'])
-        elements.append(title)
+        elements.append(self._title)
         elements.append(Spacer(1, 30))
         
         # Subtitle
@@ -149,9 +304,7 @@ class ReportGenerator:
         elements.append(Spacer(1, 20))
         
         # AI Generated notice
-        ai_notice = Paragraph("This report was generated using IBM Granite AI models and the IBM Agent Development Kit for automated disaster response planning.", 
-                            self.styles['Highlight'])
-        elements.append(ai_notice)
+        elements.append(self._ai_notice)
         
         return elements
     
@@ -162,35 +315,21 @@ class ReportGenerator:
         elements = []
         
         # Section header
-        header = Paragraph("Executive Summary", self.styles['SectionHeader'])
-        elements.append(header)
+        elements.append(self._headers["Executive Summary"])
         elements.append(Spacer(1, 12))
         
         # Key metrics table
-        metrics_data = [
-            ['Metric', 'Value'],
-            ['Disaster Type', scenario_data['disaster_type'].title()],
-            ['Severity Level', scenario_data['severity'].title()],
-            ['Affected Population', f"{scenario_data['location']['population']:,}"],
-            ['Affected Area', f"{scenario_data['affected_area_km2']} km²"],
-            ['Estimated Casualties', f"{scenario_data['estimated_casualties']:,}"],
-            ['Prediction Confidence', f"{prediction_result.get('confidence_score', 0):.1%}"],
-            ['Response Time', f"{prediction_result.get('estimated_response_time_hours', 0)} hours"],
-            ['Total Cost', f"${allocation_result.get('total_cost', 0):,.2f}"],
-            ['Plan Efficiency', f"{allocation_result.get('efficiency_score', 0):.1%}"]
-        ]
-        
-        metrics_table = Table(metrics_data, colWidths=[2*inch, 3*inch])
-        metrics_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
+        metrics_table = _render_two_col_table(('Metric', 'Value'), (
+            ('Disaster Type', scenario_data['disaster_type'].title()),
+            ('Severity Level', scenario_data['severity'].title()),
+            ('Affected Population', _FMT_INT(scenario_data['location']['population'])),
+            ('Affected Area', f"{scenario_data['affected_area_km2']} km²"),
+            ('Estimated Casualties', _FMT_INT(scenario_data['estimated_casualties'])),
+            ('Prediction Confidence', _FMT_PCT(prediction_result.get('confidence_score', 0))),
+            ('Response Time', f"{prediction_result.get('estimated_response_time_hours', 0)} hours"),
+            ('Total Cost', _FMT_MONEY(allocation_result.get('total_cost', 0))),
+            ('Plan Efficiency', _FMT_PCT(allocation_result.get('efficiency_score', 0)))
+        ), [2*inch, 3*inch])
         
         elements.append(metrics_table)
         elements.append(Spacer(1, 20))
@@ -218,44 +357,29 @@ class ReportGenerator:
         elements = []
         
         # Section header
-        header = Paragraph("Disaster Scenario Details", self.styles['SectionHeader'])
-        elements.append(header)
+        elements.append(self._headers["Disaster Scenario Details"])
         elements.append(Spacer(1, 12))
         
         # Scenario table
-        scenario_data_table = [
-            ['Detail', 'Value'],
-            ['Disaster Type', scenario_data['disaster_type'].title()],
-            ['Severity Level', scenario_data['severity'].title()],
-            ['City', scenario_data['location']['city']],
-            ['State/Province', scenario_data['location']['state']],
-            ['Country', scenario_data['location']['country']],
-            ['Population', f"{scenario_data['location']['population']:,}"],
-            ['Affected Area', f"{scenario_data['affected_area_km2']} km²"],
-            ['Estimated Casualties', f"{scenario_data['estimated_casualties']:,}"],
-            ['Available Volunteers', f"{scenario_data['available_volunteers']:,}"],
-            ['Infrastructure Damage', scenario_data['infrastructure_damage']],
-            ['Weather Conditions', scenario_data['weather_conditions']]
-        ]
-        
-        scenario_table = Table(scenario_data_table, colWidths=[2*inch, 4*inch])
-        scenario_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
+        scenario_table = _render_two_col_table(('Detail', 'Value'), (
+            ('Disaster Type', scenario_data['disaster_type'].title()),
+            ('Severity Level', scenario_data['severity'].title()),
+            ('City', scenario_data['location']['city']),
+            ('State/Province', scenario_data['location']['state']),
+            ('Country', scenario_data['location']['country']),
+            ('Population', _FMT_INT(scenario_data['location']['population'])),
+            ('Affected Area', f"{scenario_data['affected_area_km2']} km²"),
+            ('Estimated Casualties', _FMT_INT(scenario_data['estimated_casualties'])),
+            ('Available Volunteers', _FMT_INT(scenario_data['available_volunteers'])),
+            ('Infrastructure Damage', scenario_data['infrastructure_damage']),
+            ('Weather Conditions', scenario_data['weather_conditions'])
+        ), [2*inch, 4*inch])
         
         elements.append(scenario_table)
         elements.append(Spacer(1, 20))
         
         # Description
-        desc_header = Paragraph("Scenario Description", self.styles['SubsectionHeader'])
-        elements.append(desc_header)
+        elements.append(self._headers["Scenario Description"])
         elements.append(Spacer(1, 8))
         
         desc_para = Paragraph(scenario_data['description'], self.styles['BodyText'])
@@ -268,8 +392,7 @@ class ReportGenerator:
         elements = []
         
         # Section header
-        header = Paragraph("AI-Powered Resource Predictions", self.styles['SectionHeader'])
-        elements.append(header)
+        elements.append(self._headers["AI-Powered Resource Predictions"])
         elements.append(Spacer(1, 12))
         
         # Prediction metrics
@@ -286,31 +409,10 @@ class ReportGenerator:
         # Resource needs table
         predicted_needs = prediction_result.get('predicted_needs', [])
         if predicted_needs:
-            needs_header = Paragraph("Predicted Resource Needs", self.styles['SubsectionHeader'])
-            elements.append(needs_header)
+            elements.append(self._headers["Predicted Resource Needs"])
             elements.append(Spacer(1, 8))
             
-            needs_data = [['Resource Type', 'Quantity', 'Priority', 'Cost', 'Delivery Time']]
-            for need in predicted_needs:
-                needs_data.append([
-                    need.get('resource_type', ''),
-                    str(need.get('quantity', 0)),
-                    need.get('priority', ''),
-                    f"${need.get('estimated_cost', 0):,.2f}",
-                    f"{need.get('delivery_time_hours', 0)} hours"
-                ])
-            
-            needs_table = Table(needs_data, colWidths=[1.5*inch, 0.8*inch, 0.8*inch, 1*inch, 1*inch])
-            needs_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
+            needs_table = _render_resource_table(predicted_needs)
             
             elements.append(needs_table)
         
@@ -321,8 +423,7 @@ class ReportGenerator:
         elements = []
         
         # Section header
-        header = Paragraph("Optimized Resource Allocation Plan", self.styles['SectionHeader'])
-        elements.append(header)
+        elements.append(self._headers["Optimized Resource Allocation Plan"])
         elements.append(Spacer(1, 12))
         
         # Plan metrics
@@ -339,31 +440,10 @@ class ReportGenerator:
         # Resource allocations
         resource_allocations = allocation_result.get('resource_allocations', [])
         if resource_allocations:
-            alloc_header = Paragraph("Resource Allocations", self.styles['SubsectionHeader'])
-            elements.append(alloc_header)
+            elements.append(self._headers["Resource Allocations"])
             elements.append(Spacer(1, 8))
             
-            alloc_data = [['Resource Type', 'Quantity', 'Priority', 'Cost', 'Delivery Time']]
-            for alloc in resource_allocations:
-                alloc_data.append([
-                    alloc.get('resource_type', ''),
-                    str(alloc.get('quantity', 0)),
-                    alloc.get('priority', ''),
-                    f"${alloc.get('estimated_cost', 0):,.2f}",
-                    f"{alloc.get('delivery_time_hours', 0)} hours"
-                ])
-            
-            alloc_table = Table(alloc_data, colWidths=[1.5*inch, 0.8*inch, 0.8*inch, 1*inch, 1*inch])
-            alloc_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
+            alloc_table = _render_resource_table(resource_allocations)
             
             elements.append(alloc_table)
             elements.append(Spacer(1, 15))
@@ -371,25 +451,13 @@ class ReportGenerator:
         # Volunteer assignments
         volunteer_assignments = allocation_result.get('volunteer_assignments', {})
         if volunteer_assignments:
-            vol_header = Paragraph("Volunteer Assignments", self.styles['SubsectionHeader'])
-            elements.append(vol_header)
+            elements.append(self._headers["Volunteer Assignments"])
             elements.append(Spacer(1, 8))
             
-            vol_data = [['Task Category', 'Assigned Teams']]
-            for task, teams in volunteer_assignments.items():
-                vol_data.append([task.replace('_', ' ').title(), ', '.join(teams)])
-            
-            vol_table = Table(vol_data, colWidths=[2*inch, 3*inch])
-            vol_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
+            vol_table = _render_two_col_table(('Task Category', 'Assigned Teams'), (
+                (task.replace('_', ' ').title(), ', '.join(teams))
+                for task, teams in volunteer_assignments.items()
+            ), [2*inch, 3*inch], style=_VOLUNTEER_STYLE)
             
             elements.append(vol_table)
         
@@ -400,8 +468,7 @@ class ReportGenerator:
         elements = []
         
         # Section header
-        header = Paragraph("AI-Generated Narrative Analysis", self.styles['SectionHeader'])
-        elements.append(header)
+        elements.append(self._headers["AI-Generated Narrative Analysis"])
         elements.append(Spacer(1, 12))
         
         # Narrative text
@@ -416,33 +483,18 @@ class ReportGenerator:
         elements = []
         
         # Section header
-        header = Paragraph("Key Recommendations", self.styles['SectionHeader'])
-        elements.append(header)
+        elements.append(self._headers["Key Recommendations"])
         elements.append(Spacer(1, 12))
         
         # Recommendations list
-        recommendations = [
-            "Immediate medical response deployment to affected areas",
-            "Establish emergency communication channels",
-            "Coordinate with local authorities and emergency services",
-            "Monitor weather conditions and adjust plans accordingly",
-            "Deploy volunteer teams according to the allocation plan",
-            "Establish supply chain coordination for resource delivery",
-            "Implement regular status reporting and progress tracking",
-            "Prepare for potential escalation scenarios"
-        ]
-        
-        for i, rec in enumerate(recommendations, 1):
-            rec_text = f"{i}. {rec}"
-            rec_para = Paragraph(rec_text, self.styles['BodyText'])
+        for rec_para in self._recommendation_flowables:
             elements.append(rec_para)
             elements.append(Spacer(1, 6))
         
         elements.append(Spacer(1, 15))
         
         # Risk assessment
-        risk_header = Paragraph("Risk Assessment", self.styles['SubsectionHeader'])
-        elements.append(risk_header)
+        elements.append(self._headers["Risk Assessment"])
         elements.append(Spacer(1, 8))
         
         risk_factors = prediction_result.get('risk_factors', [])
@@ -0,0 +1,11 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.utils.logger import setup_logging
+
+
+@pytest.fixture(scope="session")
+def client():
+    """One TestClient for the whole session, with application logging silenced"""
+    setup_logging("CRITICAL")
+    return TestClient(app)
@@ -0,0 +1,36 @@
+import asyncio
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from app import agentic_workflow
+from app.db import PDF_RENDER_FAILED
+
+
+@pytest.fixture
+def recorded(monkeypatch):
+    """Capture pdf_path updates instead of writing them to the database"""
+    updates = []
+    monkeypatch.setattr(agentic_workflow, "_record_pdf_path",
+                        lambda report_id, pdf_path: updates.append((report_id, pdf_path)))
+    return updates
+
+
+def test_rendered_pdf_path_is_recorded(recorded):
+    """Test a finished render stores its path on the report"""
+    future = Future()
+    future.set_result("reports/report.pdf")
+
+    asyncio.run(agentic_workflow._track_pdf("report-1", future))
+    assert recorded == [("report-1", "reports/report.pdf")]
+
+
+@pytest.mark.parametrize("error", [RuntimeError("render failed"), BrokenProcessPool("worker died")])
+def test_failed_render_marks_report_failed(recorded, error):
+    """Test a render that raises, or whose pool breaks, leaves a terminal failure marker"""
+    future = Future()
+    future.set_exception(error)
+
+    asyncio.run(agentic_workflow._track_pdf("report-1", future))
+    assert recorded == [("report-1", PDF_RENDER_FAILED)]
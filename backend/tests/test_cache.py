@@ -0,0 +1,123 @@
+import asyncio
+
+import pytest
+
+from app.utils import cache as cache_module
+from app.utils.cache import PROMPT_CACHE_TTLS, PromptCache, TTLCache, cached_response
+
+
+class FakeClock:
+    """Stands in for the time module so tests control time.monotonic()"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(cache_module, "time", fake)
+    return fake
+
+
+def test_entry_expires_after_ttl(clock):
+    """Test an entry is served until its TTL passes and dropped after"""
+    cache = TTLCache(default_ttl=10.0)
+    cache.set("key", "value")
+
+    clock.now += 9.0
+    assert cache.get("key") == "value"
+
+    clock.now += 2.0
+    assert cache.get("key") is None
+    assert "key" not in cache._entries
+
+
+def test_per_entry_ttl_overrides_default(clock):
+    """Test an explicit TTL replaces the cache default"""
+    cache = TTLCache(default_ttl=10.0)
+    cache.set("short", 1, ttl=1.0)
+    cache.set("long", 2)
+
+    clock.now += 5.0
+    assert cache.get("short") is None
+    assert cache.get("long") == 2
+
+
+def test_lru_eviction_keeps_recently_read_entries(clock):
+    """Test the least recently used entry is evicted when the cache is full"""
+    cache = TTLCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_clear_drops_every_entry(clock):
+    """Test clear empties the cache"""
+    cache = TTLCache()
+    cache.set("a", 1)
+    cache.clear()
+    assert cache.get("a") is None
+
+
+@pytest.mark.parametrize("kind", sorted(PROMPT_CACHE_TTLS))
+def test_prompt_cache_uses_ttl_per_kind(clock, kind):
+    """Test each prompt kind expires after its configured TTL"""
+    cache = PromptCache()
+    cache.put("prompt", {"kind": kind}, kind=kind)
+
+    clock.now += PROMPT_CACHE_TTLS[kind] - 1
+    assert cache.get("prompt") == {"kind": kind}
+
+    clock.now += 2
+    assert cache.get("prompt") is None
+
+
+def test_prompt_cache_unknown_kind_uses_default_ttl(clock):
+    """Test a prompt kind without a configured TTL falls back to the cache default"""
+    cache = PromptCache(ttls={"predict": 5.0})
+    cache.put("prompt", {"ok": True}, kind="other")
+
+    clock.now += 6.0
+    assert cache.get("prompt") == {"ok": True}
+
+    clock.now += cache._cache.default_ttl
+    assert cache.get("prompt") is None
+
+
+def test_set_skips_values_from_before_a_clear(clock):
+    """Test a value read under an old generation is not stored after a clear"""
+    cache = TTLCache()
+    generation = cache.generation
+    cache.clear()
+
+    cache.set("key", "stale", generation=generation)
+    assert cache.get("key") is None
+
+    cache.set("key", "fresh", generation=cache.generation)
+    assert cache.get("key") == "fresh"
+
+
+def test_cached_response_drops_result_when_cleared_mid_call(clock):
+    """Test an endpoint result is not cached when a write clears the cache while it runs"""
+    cache = TTLCache()
+    calls = []
+
+    @cached_response(cache)
+    async def endpoint(item_id):
+        calls.append(item_id)
+        if len(calls) == 1:
+            cache.clear()
+        return {"item_id": item_id, "call": len(calls)}
+
+    assert asyncio.run(endpoint(item_id="a")) == {"item_id": "a", "call": 1}
+    assert asyncio.run(endpoint(item_id="a")) == {"item_id": "a", "call": 2}
+    assert asyncio.run(endpoint(item_id="a")) == {"item_id": "a", "call": 2}
@@ -0,0 +1,141 @@
+import orjson
+import pytest
+
+from app import db as db_module
+from app.db import Prediction, Report, Scenario, _copy_rows, bulk_persist
+
+
+class FakeCopy:
+    def __init__(self, cursor, sql):
+        self.cursor = cursor
+        self.sql = sql
+        self.rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.cursor.copies.append(self)
+        return False
+
+    def write_row(self, values):
+        self.rows.append(values)
+
+
+class FakeCursor:
+    """Records the COPY statements and rows psycopg would stream to Postgres"""
+
+    def __init__(self, fail_on=None):
+        self.copies = []
+        self.fail_on = fail_on
+
+    def copy(self, sql):
+        if self.fail_on and self.fail_on in sql:
+            raise RuntimeError("copy failed")
+        return FakeCopy(self, sql)
+
+
+class FakeConnection:
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.committed = self.rolled_back = self.closed = False
+
+    def cursor(self):
+        return self._cursor
+
+    def commit(self):
+        self.committed = True
+
+    def rollback(self):
+        self.rolled_back = True
+
+    def close(self):
+        self.closed = True
+
+
+class FakeEngine:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def raw_connection(self):
+        return self.connection
+
+
+def _report(**overrides):
+    values = dict(
+        id="report-1",
+        scenario_id="scenario-1",
+        prediction_id="prediction-1",
+        plan_id="plan-1",
+        narrative_summary="Summary",
+        key_recommendations=["Deploy medical teams", "Open shelters"],
+        risk_assessment="High",
+        cost_breakdown={"medical": 1500.5, "total": 1500.5},
+        pdf_path=None,
+    )
+    values.update(overrides)
+    return Report(**values)
+
+
+def test_copy_rows_column_order_and_encoding():
+    """Test COPY lists columns in table order, skips server defaults and encodes JSONB"""
+    cursor = FakeCursor()
+    _copy_rows(cursor, Report.__table__, [_report()])
+
+    (copy,) = cursor.copies
+    assert copy.sql == (
+        "COPY reports (id, scenario_id, prediction_id, plan_id, narrative_summary, "
+        "key_recommendations, risk_assessment, cost_breakdown, pdf_path) FROM STDIN"
+    )
+    (row,) = copy.rows
+    assert row == [
+        "report-1", "scenario-1", "prediction-1", "plan-1", "Summary",
+        '["Deploy medical teams","Open shelters"]', "High",
+        '{"medical":1500.5,"total":1500.5}', None,
+    ]
+
+
+def test_copy_rows_none_values():
+    """Test None stays SQL NULL in plain columns and becomes JSON null in JSONB columns"""
+    cursor = FakeCursor()
+    _copy_rows(cursor, Report.__table__, [_report(pdf_path=None, cost_breakdown=None)])
+
+    row = cursor.copies[0].rows[0]
+    assert row[-1] is None
+    assert orjson.loads(row[-2]) is None
+
+
+def test_bulk_persist_copies_parents_first(monkeypatch):
+    """Test bulk_persist copies tables in foreign-key order, skips empty groups and commits"""
+    connection = FakeConnection(FakeCursor())
+    monkeypatch.setattr(db_module, "engine", FakeEngine(connection))
+
+    scenario = Scenario(
+        id="scenario-1", disaster_type="flood", severity="medium", latitude=40.7, longitude=-74.0,
+        city="New York", state="New York", country="United States", population=8336817,
+        affected_area_km2=75.2, estimated_casualties=1200, infrastructure_damage="Flooding",
+        weather_conditions="Rain", available_volunteers=2000, description="Flood"
+    )
+    prediction = Prediction(
+        id="prediction-1", scenario_id="scenario-1", predicted_needs=[{"resource_type": "water"}],
+        confidence_score=0.9, estimated_response_time_hours=12, risk_factors=["flooding"]
+    )
+    bulk_persist([scenario], [prediction], [], [_report()])
+
+    copies = connection.cursor().copies
+    assert [copy.sql.split()[1] for copy in copies] == ["scenarios", "predictions", "reports"]
+    assert copies[1].rows[0][2] == '[{"resource_type":"water"}]'
+    assert connection.committed and connection.closed
+    assert not connection.rolled_back
+
+
+def test_bulk_persist_rolls_back_on_failure(monkeypatch):
+    """Test a failed COPY rolls the whole batch back"""
+    connection = FakeConnection(FakeCursor(fail_on="COPY reports"))
+    monkeypatch.setattr(db_module, "engine", FakeEngine(connection))
+
+    with pytest.raises(RuntimeError):
+        bulk_persist([], [], [], [_report()])
+
+    assert connection.rolled_back and connection.closed
+    assert not connection.committed
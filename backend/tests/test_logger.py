@@ -0,0 +1,78 @@
+import os
+
+import orjson
+import pytest
+
+from app.utils.logger import BatchWriter
+
+
+@pytest.fixture
+def pipe():
+    read_fd, write_fd = os.pipe()
+    yield read_fd, write_fd
+    for fd in (read_fd, write_fd):
+        try:
+            os.close(fd)
+        except OSError:
+            pass
+
+
+def _read_lines(read_fd):
+    return os.read(read_fd, 1 << 20).splitlines()
+
+
+def test_lines_reach_the_fd_in_order(pipe):
+    """Test buffered lines are written out in order once the writer stops"""
+    read_fd, write_fd = pipe
+    writer = BatchWriter(write_fd)
+    for i in range(100):
+        writer.write(b"line %d\n" % i)
+    writer.stop()
+
+    assert _read_lines(read_fd) == [b"line %d" % i for i in range(100)]
+    assert writer.dropped == 0
+
+
+def test_full_buffer_drops_and_reports_lines(pipe):
+    """Test lines beyond the buffer cap are dropped, counted and reported"""
+    read_fd, write_fd = pipe
+    writer = BatchWriter(write_fd, interval=60.0, max_buffered_bytes=10)
+    # With the flusher stopped nothing drains the buffer, as under a stalled reader
+    writer.stop()
+    writer.write(b"12345\n")
+    writer.write(b"67890\n")
+    writer.write(b"abc\n")
+    assert writer.dropped == 1
+
+    writer._flush(writer._take())
+    first, second, notice = _read_lines(read_fd)
+    assert (first, second) == (b"12345", b"abc")
+    assert orjson.loads(notice)["dropped"] == 1
+
+
+def test_failed_write_counts_dropped_lines(pipe):
+    """Test lines lost to a write error are counted rather than silently discarded"""
+    read_fd, write_fd = pipe
+    writer = BatchWriter(write_fd)
+    writer.stop()
+    os.close(write_fd)
+
+    writer._flush([b"a\n", b"b\n", b"c\n"])
+    assert writer.dropped == 3
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires fork")
+def test_forked_child_writes_before_os_exit(pipe):
+    """Test a line logged in a forked child survives the child leaving via os._exit"""
+    read_fd, write_fd = pipe
+    writer = BatchWriter(write_fd, interval=60.0)
+
+    pid = os.fork()
+    if pid == 0:
+        writer.after_fork()
+        writer.write(b"from child\n")
+        os._exit(0)
+
+    os.waitpid(pid, 0)
+    writer.stop()
+    assert _read_lines(read_fd) == [b"from child"]
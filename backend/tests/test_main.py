@@ -1,11 +1,97 @@
+import asyncio
+import orjson
 import pytest
-from fastapi.testclient import TestClient
-from app.main import app
+from datetime import datetime, timedelta, timezone
+from types import MappingProxyType
 
-client = TestClient(app)
+from app.db import PDF_RENDER_FAILED
+from app.main import _BATCH_ROUTES, BATCH_CONCURRENCY, PDF_RENDER_TIMEOUT, planner
+from app.models import MAX_BATCH_ITEMS
 
+# Sample scenarios are read-only and pre-serialized once for the POST tests
+EARTHQUAKE_SCENARIO = MappingProxyType({
+    "disaster_type": "earthquake",
+    "severity": "high",
+    "location": {
+        "latitude": 34.0522,
+        "longitude": -118.2437,
+        "city": "Los Angeles",
+        "state": "California",
+        "country": "United States",
+        "population": 3979576
+    },
+    "affected_area_km2": 150.5,
+    "estimated_casualties": 2500,
+    "infrastructure_damage": "Significant damage to buildings and roads",
+    "weather_conditions": "Clear skies, moderate temperatures",
+    "available_volunteers": 1500,
+    "description": "A 7.2 magnitude earthquake has struck Los Angeles"
+})
 
-def test_root_endpoint():
+HURRICANE_SCENARIO = MappingProxyType({
+    "disaster_type": "hurricane",
+    "severity": "critical",
+    "location": {
+        "latitude": 25.7617,
+        "longitude": -80.1918,
+        "city": "Miami",
+        "state": "Florida",
+        "country": "United States",
+        "population": 454279
+    },
+    "affected_area_km2": 200.0,
+    "estimated_casualties": 5000,
+    "infrastructure_damage": "Extensive flooding, destroyed homes",
+    "weather_conditions": "Heavy rainfall, strong winds",
+    "available_volunteers": 800,
+    "description": "Hurricane Maria has made landfall in Miami"
+})
+
+FLOOD_SCENARIO = MappingProxyType({
+    "disaster_type": "flood",
+    "severity": "medium",
+    "location": {
+        "latitude": 40.7128,
+        "longitude": -74.0060,
+        "city": "New York",
+        "state": "New York",
+        "country": "United States",
+        "population": 8336817
+    },
+    "affected_area_km2": 75.2,
+    "estimated_casualties": 1200,
+    "infrastructure_damage": "Subway system flooded, roads impassable",
+    "weather_conditions": "Heavy rainfall for 48 hours",
+    "available_volunteers": 2000,
+    "description": "Heavy rainfall has caused severe flooding"
+})
+
+WILDFIRE_SCENARIO = MappingProxyType({
+    "disaster_type": "wildfire",
+    "severity": "high",
+    "location": {
+        "latitude": 34.0522,
+        "longitude": -118.2437,
+        "city": "Los Angeles",
+        "state": "California",
+        "country": "United States",
+        "population": 3979576
+    },
+    "affected_area_km2": 120.0,
+    "estimated_casualties": 300,
+    "infrastructure_damage": "Power lines down, evacuation routes congested",
+    "weather_conditions": "Dry, strong Santa Ana winds",
+    "available_volunteers": 800,
+    "description": "Fast-moving wildfire near residential areas"
+})
+
+_JSON_HEADERS = {"content-type": "application/json"}
+_EARTHQUAKE_JSON = orjson.dumps(dict(EARTHQUAKE_SCENARIO))
+_HURRICANE_JSON = orjson.dumps(dict(HURRICANE_SCENARIO))
+_FLOOD_JSON = orjson.dumps(dict(FLOOD_SCENARIO))
+
+
+def test_root_endpoint(client):
     """Test the root endpoint"""
     response = client.get("/")
     assert response.status_code == 200
@@ -14,7 +100,7 @@ def test_root_endpoint():
     assert "RapidRelief API" in data["message"]
 
 
-def test_health_endpoint():
+def test_health_endpoint(client):
     """Test the health check endpoint"""
     response = client.get("/health")
     assert response.status_code == 200
@@ -23,7 +109,7 @@ def test_health_endpoint():
     assert data["data"]["status"] == "healthy"
 
 
-def test_disaster_types_endpoint():
+def test_disaster_types_endpoint(client):
     """Test the disaster types endpoint"""
     response = client.get("/disaster-types")
     assert response.status_code == 200
@@ -33,7 +119,7 @@ def test_disaster_types_endpoint():
     assert len(data["data"]["disaster_types"]) > 0
 
 
-def test_severity_levels_endpoint():
+def test_severity_levels_endpoint(client):
     """Test the severity levels endpoint"""
     response = client.get("/severity-levels")
     assert response.status_code == 200
@@ -43,7 +129,7 @@ def test_severity_levels_endpoint():
     assert len(data["data"]["severity_levels"]) > 0
 
 
-def test_scenarios_endpoint():
+def test_scenarios_endpoint(client):
     """Test the scenarios endpoint"""
     response = client.get("/scenarios")
     assert response.status_code == 200
@@ -52,91 +138,148 @@ def test_scenarios_endpoint():
     assert "scenarios" in data["data"]
 
 
-def test_predict_endpoint():
+def test_predict_endpoint(client):
     """Test the predict endpoint with sample data"""
-    sample_scenario = {
-        "disaster_type": "earthquake",
-        "severity": "high",
-        "location": {
-            "latitude": 34.0522,
-            "longitude": -118.2437,
-            "city": "Los Angeles",
-            "state": "California",
-            "country": "United States",
-            "population": 3979576
-        },
-        "affected_area_km2": 150.5,
-        "estimated_casualties": 2500,
-        "infrastructure_damage": "Significant damage to buildings and roads",
-        "weather_conditions": "Clear skies, moderate temperatures",
-        "available_volunteers": 1500,
-        "description": "A 7.2 magnitude earthquake has struck Los Angeles"
-    }
-    
-    response = client.post("/predict", json=sample_scenario)
+    response = client.post("/predict", content=_EARTHQUAKE_JSON, headers=_JSON_HEADERS)
     assert response.status_code == 200
     data = response.json()
     assert data["success"] is True
     assert "prediction_id" in data["data"]
 
 
-def test_plan_endpoint():
+def test_repeated_prediction_gets_its_own_record(client, monkeypatch):
+    """Test a cached prediction is stored under a fresh ID for the new scenario"""
+    # /predict does not insert a scenario row, so keep the predictions off the
+    # database and check what would be written
+    persisted = []
+    monkeypatch.setattr("app.planner._persist", lambda db, row: persisted.append(row))
+    granite_calls = []
+    predict_resources = planner.granite_client.predict_resources
+
+    async def counting_predict(scenario_data):
+        granite_calls.append(scenario_data["id"])
+        return await predict_resources(scenario_data)
+    monkeypatch.setattr(planner.granite_client, "predict_resources", counting_predict)
+
+    scenario = dict(HURRICANE_SCENARIO, description="Repeated prediction")
+    first = client.post("/predict", json=scenario).json()["data"]
+    second = client.post("/predict", json=scenario).json()["data"]
+    assert len(granite_calls) == 1
+    assert first["prediction_id"] != second["prediction_id"]
+    assert first["predicted_needs"] == second["predicted_needs"]
+
+    first_row, second_row = persisted
+    assert (first_row.id, second_row.id) == (first["prediction_id"], second["prediction_id"])
+    assert first_row.scenario_id != second_row.scenario_id
+    assert second_row.predicted_needs == first_row.predicted_needs
+
+
+def test_plan_endpoint(client):
     """Test the plan endpoint with sample data"""
-    sample_scenario = {
-        "disaster_type": "hurricane",
-        "severity": "critical",
-        "location": {
-            "latitude": 25.7617,
-            "longitude": -80.1918,
-            "city": "Miami",
-            "state": "Florida",
-            "country": "United States",
-            "population": 454279
-        },
-        "affected_area_km2": 200.0,
-        "estimated_casualties": 5000,
-        "infrastructure_damage": "Extensive flooding, destroyed homes",
-        "weather_conditions": "Heavy rainfall, strong winds",
-        "available_volunteers": 800,
-        "description": "Hurricane Maria has made landfall in Miami"
-    }
-    
-    response = client.post("/plan", json=sample_scenario)
+    response = client.post("/plan", content=_HURRICANE_JSON, headers=_JSON_HEADERS)
     assert response.status_code == 200
     data = response.json()
     assert data["success"] is True
     assert "scenario_id" in data["data"]
 
 
-def test_report_endpoint():
+def test_report_endpoint(client):
     """Test the report endpoint with sample data"""
-    sample_scenario = {
-        "disaster_type": "flood",
-        "severity": "medium",
-        "location": {
-            "latitude": 40.7128,
-            "longitude": -74.0060,
-            "city": "New York",
-            "state": "New York",
-            "country": "United States",
-            "population": 8336817
-        },
-        "affected_area_km2": 75.2,
-        "estimated_casualties": 1200,
-        "infrastructure_damage": "Subway system flooded, roads impassable",
-        "weather_conditions": "Heavy rainfall for 48 hours",
-        "available_volunteers": 2000,
-        "description": "Heavy rainfall has caused severe flooding"
-    }
-    
-    response = client.post("/report", json=sample_scenario)
-    assert response.status_code == 200
+    response = client.post("/report", content=_FLOOD_JSON, headers=_JSON_HEADERS)
+    assert response.status_code == 202
     data = response.json()
     assert data["success"] is True
     assert "workflow_id" in data["data"]
+    assert data["data"]["download_url"] == f"/download/{data['data']['report_id']}"
 
 
-def test_invalid_scenario_data():
+def test_scenarios_listing_is_fresh_after_post(client):
+    """Test the scenario listing includes a scenario added by a POST right before it"""
+    params = {"limit": 500}
+    before = client.get("/scenarios", params=params)
+    assert before.status_code == 200
+    assert client.get("/scenarios", params=params).json() == before.json()
+
+    created = client.post("/report", content=_FLOOD_JSON, headers=_JSON_HEADERS)
+    assert created.status_code == 202
+
+    after = client.get("/scenarios", params=params).json()
+    assert created.json()["data"]["scenario_id"] in {scenario["id"] for scenario in after["data"]["scenarios"]}
+
+
+def test_batch_endpoint(client):
+    """Test the batch endpoint shares one prediction between /predict and /plan"""
+    scenario = dict(WILDFIRE_SCENARIO)
+    response = client.post("/batch", json={"requests": [
+        {"id": "predict", "url": "/predict", "body": scenario},
+        {"id": "plan", "url": "/plan", "body": scenario},
+        {"id": "unknown", "url": "/unknown", "body": scenario}
+    ]})
+    assert response.status_code == 200
+    responses = {item["id"]: item for item in response.json()["responses"]}
+    assert responses["predict"]["status"] == 200
+    assert responses["plan"]["status"] == 200
+    assert responses["unknown"]["status"] == 404
+    assert (responses["plan"]["body"]["data"]["prediction"]["prediction_id"]
+            == responses["predict"]["body"]["data"]["prediction_id"])
+
+
+def test_batch_rejects_oversize_requests(client):
+    """Test a batch over the item limit is rejected before any item runs"""
+    item = {"id": "predict", "url": "/predict", "body": dict(WILDFIRE_SCENARIO)}
+    response = client.post("/batch", json={"requests": [item] * (MAX_BATCH_ITEMS + 1)})
+    assert response.status_code == 422
+
+
+def test_batch_limits_concurrent_items(client, monkeypatch):
+    """Test no more than BATCH_CONCURRENCY batch items run at once"""
+    running, peak = 0, 0
+
+    async def slow_predict(scenario_data, prediction, workflow):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return 200, "ok", {}
+    monkeypatch.setitem(_BATCH_ROUTES, "/predict", slow_predict)
+
+    items = [
+        {"id": str(i), "url": "/predict", "body": dict(WILDFIRE_SCENARIO, description=f"Item {i}")}
+        for i in range(MAX_BATCH_ITEMS)
+    ]
+    response = client.post("/batch", json={"requests": items})
+    assert response.status_code == 200
+    assert all(item["status"] == 200 for item in response.json()["responses"])
+    assert peak == BATCH_CONCURRENCY
+
+
+def test_batch_report_items_share_one_workflow(client, monkeypatch):
+    """Test several /report items in a batch run through one batched workflow"""
+    persisted = []
+    monkeypatch.setattr("app.agentic_workflow.bulk_persist", lambda *groups: persisted.append(groups))
+
+    response = client.post("/batch", json={"requests": [
+        {"id": "flood", "url": "/report", "body": dict(FLOOD_SCENARIO)},
+        {"id": "wildfire", "url": "/report", "body": dict(WILDFIRE_SCENARIO)}
+    ]})
+    assert response.status_code == 200
+    responses = {item["id"]: item for item in response.json()["responses"]}
+    assert responses["flood"]["status"] == responses["wildfire"]["status"] == 202
+    flood, wildfire = responses["flood"]["body"]["data"], responses["wildfire"]["body"]["data"]
+    assert flood["workflow_id"] == wildfire["workflow_id"]
+    assert flood["report_id"] != wildfire["report_id"]
+
+    # One bulk insert carrying every scenario, prediction, plan and report row
+    assert len(persisted) == 1
+    scenarios, predictions, plans, reports = persisted[0]
+    assert [row.id for row in scenarios] == [flood["scenario_id"], wildfire["scenario_id"]]
+    assert [row.id for row in predictions] == [flood["prediction_id"], wildfire["prediction_id"]]
+    assert [row.id for row in plans] == [flood["plan_id"], wildfire["plan_id"]]
+    assert [row.id for row in reports] == [flood["report_id"], wildfire["report_id"]]
+
+
+def test_invalid_scenario_data(client):
     """Test endpoint with invalid data"""
     invalid_scenario = {
         "disaster_type": "invalid_type",
@@ -161,7 +304,7 @@ def test_invalid_scenario_data():
     assert response.status_code == 422  # Validation error
 
 
-def test_missing_required_fields():
+def test_missing_required_fields(client):
     """Test endpoint with missing required fields"""
     incomplete_scenario = {
         "disaster_type": "earthquake",
@@ -173,31 +316,48 @@ def test_missing_required_fields():
     assert response.status_code == 422  # Validation error
 
 
-def test_nonexistent_scenario():
-    """Test getting a non-existent scenario"""
-    response = client.get("/scenarios/nonexistent-id")
+@pytest.mark.parametrize("path", [
+    "/scenarios/nonexistent-id",
+    "/predictions/nonexistent-id",
+    "/plans/nonexistent-id",
+    "/reports/nonexistent-id",
+    "/download/nonexistent-id"
+])
+def test_nonexistent_resource(client, path):
+    """Test getting or downloading a non-existent record"""
+    response = client.get(path)
     assert response.status_code == 404
 
 
-def test_nonexistent_prediction():
-    """Test getting a non-existent prediction"""
-    response = client.get("/predictions/nonexistent-id")
-    assert response.status_code == 404
+def _stub_report(monkeypatch, pdf_path, age_seconds=0):
+    """Serve a report row with the given pdf_path and age from the planner"""
+    created_at = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(seconds=age_seconds)
 
+    async def get_report_by_id(report_id, db):
+        return {"id": report_id, "pdf_path": pdf_path, "created_at": created_at}
+    monkeypatch.setattr("app.main.planner.get_report_by_id", get_report_by_id)
 
-def test_nonexistent_plan():
-    """Test getting a non-existent plan"""
-    response = client.get("/plans/nonexistent-id")
-    assert response.status_code == 404
 
+def test_download_pending_pdf(client, monkeypatch):
+    """Test downloading a report whose PDF is still rendering fails with Retry-After"""
+    _stub_report(monkeypatch, pdf_path=None)
 
-def test_nonexistent_report():
-    """Test getting a non-existent report"""
-    response = client.get("/reports/nonexistent-id")
-    assert response.status_code == 404
+    response = client.get("/download/pending-id")
+    assert response.status_code == 409
+    assert response.headers["retry-after"] == "2"
+    assert response.headers["content-type"] == "application/json"
+    assert response.json()["success"] is False
 
 
-def test_download_nonexistent_report():
-    """Test downloading a non-existent report"""
-    response = client.get("/download/nonexistent-id")
-    assert response.status_code == 404
+@pytest.mark.parametrize("pdf_path, age_seconds", [
+    (PDF_RENDER_FAILED, 0),
+    (None, PDF_RENDER_TIMEOUT + 60),
+])
+def test_download_failed_pdf(client, monkeypatch, pdf_path, age_seconds):
+    """Test a failed or abandoned render is reported as failed, not as pending"""
+    _stub_report(monkeypatch, pdf_path=pdf_path, age_seconds=age_seconds)
+
+    response = client.get("/download/failed-id")
+    assert response.status_code == 500
+    assert "retry-after" not in response.headers
+    assert response.json()["message"] == "PDF report generation failed"
@@ -0,0 +1,129 @@
+import asyncio
+
+import pytest
+
+from app.utils.middleware import DeduplicationMiddleware
+
+
+class GatedApp:
+    """ASGI app that echoes the request body once its gate opens, counting calls"""
+
+    def __init__(self, fail_times=0, error_status=None):
+        self.calls = 0
+        self.fail_times = fail_times
+        self.error_status = error_status
+        self.gate = asyncio.Event()
+
+    async def __call__(self, scope, receive, send):
+        self.calls += 1
+        message = await receive()
+        await self.gate.wait()
+        if self.calls <= self.fail_times:
+            if self.error_status is None:
+                raise RuntimeError("handler failed")
+            await send({"type": "http.response.start", "status": self.error_status, "headers": []})
+            await send({"type": "http.response.body", "body": b"error"})
+            return
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": message["body"]})
+
+
+async def _post(middleware, body, path="/predict"):
+    """Send one POST through the middleware and return (status, body)"""
+    scope = {"type": "http", "method": "POST", "path": path, "query_string": b"", "headers": []}
+    delivered = False
+
+    async def receive():
+        nonlocal delivered
+        if delivered:
+            return {"type": "http.disconnect"}
+        delivered = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    try:
+        await middleware(scope, receive, send)
+    except RuntimeError:
+        return None, None
+    return sent[0]["status"], b"".join(message.get("body", b"") for message in sent[1:])
+
+
+async def _run_concurrently(app, *requests):
+    """Start every request, let them reach the app, then open its gate"""
+    middleware = DeduplicationMiddleware(app, methods=("POST",))
+    tasks = [asyncio.ensure_future(_post(middleware, body, path)) for body, path in requests]
+    for _ in range(5):
+        await asyncio.sleep(0)
+    app.gate.set()
+    return await asyncio.gather(*tasks)
+
+
+def test_identical_posts_run_handler_once():
+    """Test concurrent identical POSTs share one handler run and its response"""
+    async def scenario():
+        app = GatedApp()
+        results = await _run_concurrently(app, *[(b'{"a": 1}', "/predict")] * 3)
+        return app, results
+
+    app, results = asyncio.run(scenario())
+    assert app.calls == 1
+    assert results == [(200, b'{"a": 1}')] * 3
+
+
+@pytest.mark.parametrize("requests", [
+    [(b'{"a": 1}', "/predict"), (b'{"a": 2}', "/predict")],
+    [(b'{"a": 1}', "/predict"), (b'{"a": 1}', "/plan")],
+])
+def test_different_requests_are_not_merged(requests):
+    """Test POSTs with different bodies or paths each reach the handler"""
+    async def scenario():
+        app = GatedApp()
+        results = await _run_concurrently(app, *requests)
+        return app, results
+
+    app, results = asyncio.run(scenario())
+    assert app.calls == 2
+    assert results == [(200, body) for body, _ in requests]
+
+
+def test_failed_leader_lets_followers_rerun():
+    """Test followers of a request that raised run the handler themselves"""
+    async def scenario():
+        app = GatedApp(fail_times=1)
+        results = await _run_concurrently(app, *[(b'{"a": 1}', "/predict")] * 3)
+        return app, results
+
+    app, results = asyncio.run(scenario())
+    assert app.calls == 3
+    assert results == [(None, None), (200, b'{"a": 1}'), (200, b'{"a": 1}')]
+
+
+def test_server_error_is_not_replayed():
+    """Test a leader's 5xx response is not replayed to its followers"""
+    async def scenario():
+        app = GatedApp(fail_times=1, error_status=500)
+        results = await _run_concurrently(app, *[(b'{"a": 1}', "/predict")] * 2)
+        return app, results
+
+    app, results = asyncio.run(scenario())
+    assert app.calls == 2
+    assert results == [(500, b"error"), (200, b'{"a": 1}')]
+
+
+def test_sequential_posts_are_not_deduplicated():
+    """Test a POST that arrives after the first one finished runs again"""
+    async def scenario():
+        app = GatedApp()
+        app.gate.set()
+        middleware = DeduplicationMiddleware(app, methods=("POST",))
+        first = await _post(middleware, b'{"a": 1}')
+        second = await _post(middleware, b'{"a": 1}')
+        return app, [first, second]
+
+    app, results = asyncio.run(scenario())
+    assert app.calls == 2
+    assert results == [(200, b'{"a": 1}')] * 2
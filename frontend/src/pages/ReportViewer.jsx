@@ -4,6 +4,9 @@ import { Download, ArrowLeft, FileText, AlertTriangle, MapPin, Users, Calendar,
 import { toast } from 'react-hot-toast'
 import axios from 'axios'
 
+// Download attempts made while the PDF is still rendering
+const MAX_DOWNLOAD_RETRIES = 5
+
 const ReportViewer = () => {
   const { reportId } = useParams()
   const [report, setReport] = useState(null)
@@ -46,11 +49,31 @@ const ReportViewer = () => {
 
   const downloadReport = async () => {
     try {
-      const response = await axios.get(`/api/download/${reportId}`, {
-        responseType: 'blob'
-      })
-      
-      const url = window.URL.createObjectURL(new Blob([response.data]))
+      // The PDF renders in the background; while it is pending the API answers
+      // 409 with Retry-After, so wait and try again a few times
+      let response
+      for (let attempt = 0; ; attempt++) {
+        try {
+          response = await axios.get(`/api/download/${reportId}`, {
+            responseType: 'blob'
+          })
+          break
+        } catch (error) {
+          if (error.response?.status !== 409) throw error
+          if (attempt >= MAX_DOWNLOAD_RETRIES) {
+            toast.error('The PDF is still being generated, please try again shortly')
+            return
+          }
+          const retryAfter = Number(error.response.headers['retry-after']) || 2
+          await new Promise((resolve) => setTimeout(resolve, retryAfter * 1000))
+        }
+      }
+
+      if (!response.headers['content-type']?.startsWith('application/pdf')) {
+        throw new Error(`Unexpected content type: ${response.headers['content-type']}`)
+      }
+
+      const url = window.URL.createObjectURL(new Blob([response.data], { type: 'application/pdf' }))
       const link = document.createElement('a')
       link.href = url
       link.setAttribute('download', `disaster_response_report_${reportId}.pdf`)
@@ -62,7 +85,10 @@ const ReportViewer = () => {
       toast.success('Report downloaded successfully!')
     } catch (error) {
       console.error('Error downloading report:', error)
-      toast.error('Failed to download report')
+      // 500 means the PDF render failed for good; retrying will not help
+      toast.error(error.response?.status === 500
+        ? 'PDF generation failed for this report'
+        : 'Failed to download report')
     }
   }
 